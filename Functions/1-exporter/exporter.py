@@ -0,0 +1,373 @@
+"""Per-bundle export routines of the Exporter.
+
+Every routine takes the path of a single bundle, exports what it finds and
+returns a small result dict that main.py merges into strings.json and the
+[SUMMARY]. The module has no import-time side effects, so the routines can
+run both in the main process (WORKERS=1) and in worker processes of a
+process pool - in the latter case log records are collected and sent back
+to the main process together with the result (see run_collecting).
+
+Results are plain JSON-able dicts, which is also what lets ExportManifest
+store them and hand them back for unchanged bundles in incremental mode. A
+result carrying 'failed' is never stored - the bundle is retried next run.
+"""
+
+import os
+import json
+import threading
+import traceback
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import UnityPy
+from UnityPy.export.Texture2DConverter import parse_image_data
+
+from runlog import RecordCollector
+from state_file import load_state, save_state
+from catalog import is_dialogue_db_type, is_tmp_type
+from string_index import strings_key
+from tmp_override import is_tmp_tree
+
+
+# buffer size for JSON outputs - json.dump() emits many tiny chunks
+JSON_WRITE_BUFFER = 1024 * 1024
+
+
+def write_json(path, data):
+    """Write data as indented JSON (the format the Sheetifier reads).
+
+    json.dump() walks the object with the same iterencode() that json.dumps()
+    joins into one string, so the output is byte-identical - but it is
+    streamed to the file chunk by chunk instead of first being built as one
+    multi-megabyte string next to the typetree dict."""
+    with open(path, 'w', encoding='utf-8', buffering=JSON_WRITE_BUFFER) as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def init_worker(unity_version, use_python_parser):
+    """Process pool initializer: apply the same UnityPy configuration the
+    main process uses (spawned workers start from a clean interpreter)."""
+    warnings.filterwarnings("ignore", category=UnityPy.config.UnityVersionFallbackWarning)
+    UnityPy.config.FALLBACK_UNITY_VERSION = unity_version
+    if use_python_parser:
+        from UnityPy.helpers import TypeTreeHelper
+        TypeTreeHelper.read_typetree_boost = False
+
+
+def run_collecting(func, *args):
+    """Run an export routine in a worker process, collecting its log records
+    into the result instead of writing them (the log file belongs to the
+    main process, see runlog.RunLog.write_records)."""
+    collector = RecordCollector()
+    result = func(*args, log=collector)
+    result['log'] = collector.records
+    return result
+
+
+def export_scene_bundle(file_path, log):
+    """Collect the m_text of every world-space TextMeshPro object in a scene
+    bundle. Returns {'strings': [escaped strings.json keys], 'occurrences':
+    [[key, serialized file name, path_id, GameObject path_id]]} - the
+    latter is what string_index.StringIndex stores for the patcher."""
+    bundle_name = os.path.basename(file_path)
+    strings = []
+    occurrences = []
+    log(f"Reading: {file_path}")
+    try:
+        env = UnityPy.load(file_path)
+        for obj in env.objects:
+            if obj.type.name == 'MonoBehaviour':
+                # only TMP-shaped types are deserialized at all
+                if not is_tmp_type(obj):
+                    continue
+                try:
+                    tree = obj.read_typetree()
+                    # Detect world-space TextMeshPro by structure (script pointer may be cross-bundle)
+                    # World-space TMP has _SortingLayer/_SortingOrder fields; TextMeshProUGUI does not
+                    if is_tmp_tree(tree):
+                        key = strings_key(tree['m_text'])
+                        strings.append(key)
+                        occurrences.append([key, obj.assets_file.name, obj.path_id,
+                                            tree['m_GameObject']['m_PathID']])
+                except Exception as inner_e:
+                    log(f"Error processing object in {bundle_name}: {str(inner_e)}")
+                    continue
+    except Exception as e:
+        log(f"ERROR processing bundle {bundle_name}: {str(e)}")
+        log(traceback.format_exc())
+        return {'strings': strings, 'occurrences': occurrences, 'failed': True}
+    return {'strings': strings, 'occurrences': occurrences}
+
+
+def export_dialogue_bundle(file_path, res_dir, log):
+    """Export every DialogueDatabase of a bundle into
+    res_dir/<bundle_name>/<asset path>.json. Returns {'dialogues': [paths]}."""
+    bundle_name = os.path.basename(file_path)
+    written = []
+    log(f"Reading: {file_path}")
+    try:
+        env = UnityPy.load(file_path)
+        bundle_dest = os.path.join(res_dir, bundle_name)
+
+        # Build a path_id -> asset_path lookup from the container
+        pathid_to_asset = {}
+        for asset_path, obj in env.container.items():
+            pathid_to_asset[obj.path_id] = asset_path
+
+        for obj in env.objects:
+            if obj.type.name != 'MonoBehaviour':
+                continue
+            # Detect DialogueDatabase by structure (script pointer is cross-bundle),
+            # on the type node first - only databases get deserialized
+            if not is_dialogue_db_type(obj):
+                continue
+
+            asset_path = pathid_to_asset.get(obj.path_id, '')
+
+            if 'DialogueDatabaseArchive' in asset_path: # skip archived convos
+                continue
+
+            try:
+                typetree = obj.read_typetree()
+            except Exception as e:
+                log(f"Warning: failed to read typetree in {bundle_name}: {str(e)}")
+                continue
+
+            if not ('conversations' in typetree and 'actors' in typetree and 'items' in typetree):
+                continue
+
+            # build destination path
+            if asset_path:
+                asset_dir = os.path.join(bundle_dest, os.path.dirname(asset_path))
+                filename = os.path.basename(asset_path) + ".json"
+            else:
+                # fallback: use m_Name
+                m_name = typetree.get('m_Name', f'dialogue_{obj.path_id}')
+                asset_dir = bundle_dest
+                filename = m_name + ".json"
+
+            os.makedirs(asset_dir, exist_ok=True)
+            output_path = os.path.join(asset_dir, filename)
+            log(f"Writing dialogue: {output_path}")
+            write_json(output_path, typetree)
+
+            written.append(output_path)
+    except Exception as e:
+        log(f"ERROR processing dialogue bundle {bundle_name}: {str(e)}")
+        log(traceback.format_exc())
+        return {'dialogues': written, 'failed': True}
+    return {'dialogues': written}
+
+
+# PNG settings per EXPORT_PROFILE: 'release' keeps Pillow's default
+# compression, 'fast' trades file size for speed on iteration runs
+PNG_PROFILES = {
+    'release': {},
+    'fast':    {'compress_level': 1},
+}
+
+
+def texture_decoder(texture):
+    """Capture everything needed to decode a Texture2D while still on the
+    reading thread (UnityPy readers are not thread-safe) and return a
+    callable doing the actual - thread-safe - decoding into a PIL image."""
+    reader = texture.object_reader
+    args = (texture.get_image_data(), texture.m_Width, texture.m_Height,
+            texture.m_TextureFormat, reader.version, reader.platform,
+            getattr(texture, 'm_PlatformBlob', None))
+    return lambda: parse_image_data(*args)
+
+
+class ImageWriter:
+    """
+    Decodes textures and writes them as PNGs on a thread pool, so decoding
+    and PNG compression overlap with parsing the rest of the bundle (both
+    release the GIL). At most threads * 2 images are in flight - each holds
+    its raw texture data - so memory stays flat however many textures a
+    bundle holds.
+    """
+
+    def __init__(self, threads, png_options, log):
+        self._pool = ThreadPoolExecutor(max_workers=threads)
+        self._slots = threading.Semaphore(threads * 2)
+        self._pending = []
+        self._png_options = png_options
+        self.log = log
+
+    def submit(self, decode, path):
+        """Queue decode() -> PNG at path; blocks while the queue is full."""
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._write, decode, path)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._pending.append((path, future))
+
+    def _write(self, decode, path):
+        decode().save(path, **self._png_options)
+
+    def close(self):
+        """Wait for all queued images. Returns the number of failed ones."""
+        failed = 0
+        for path, future in self._pending:
+            try:
+                future.result()
+            except Exception as e:
+                self.log(f"ERROR writing texture {path}: {str(e)}")
+                failed += 1
+        self._pool.shutdown()
+        return failed
+
+
+def export_sprite_atlas(env, obj, asset_path, textures_dir, writer, log):
+    """Export the packed texture page(s) of a SpriteAtlas as PNG(s).
+    Returns the paths of the queued PNGs (empty if nothing was exported).
+
+    Output layout:
+      TEXTURES_DIR/<AtlasName>.png       - the atlas texture (single page)
+      TEXTURES_DIR/<AtlasName>#<n>.png   - extra pages, if any
+    """
+    atlas_name = os.path.basename(asset_path).replace('.spriteatlas', '')
+    data = obj.read()
+    pathid_to_obj = {o.path_id: o for o in env.objects}
+
+    # decode each atlas page once
+    pages = []
+    seen = set()
+    for _, rd in data.m_RenderDataMap:
+        tex_ref = rd.texture
+        pid = tex_ref.m_PathID
+        if tex_ref.m_FileID != 0 or pid not in pathid_to_obj:
+            log(f"Warning: atlas {atlas_name} references an external texture "
+                f"(fileID={tex_ref.m_FileID}, pathID={pid}), skipping page")
+            continue
+        if pid not in seen:
+            seen.add(pid)
+            pages.append(texture_decoder(pathid_to_obj[pid].read()))
+
+    if not pages:
+        log(f"Warning: atlas {atlas_name} has no decodable texture pages")
+        return []
+
+    os.makedirs(textures_dir, exist_ok=True)
+    written = []
+    for idx, decode in enumerate(pages):
+        suffix = '' if len(pages) == 1 else f'#{idx}'
+        full_path = os.path.join(textures_dir, f"{atlas_name}{suffix}.png")
+        log(f"Writing atlas texture: {full_path}")
+        writer.submit(decode, full_path)
+        written.append(full_path)
+
+    return written
+
+
+def export_texture_bundle(file_path, textures, textures_dir, image_options, log):
+    """Export the listed textures, sprites and sprite atlases of a bundle as
+    PNGs. image_options is (threads, EXPORT_PROFILE name). Returns
+    {'textures_num': n, 'exported': [asset paths], 'files': [PNG paths]}."""
+    bundle_name = os.path.basename(file_path)
+    textures_num = 0
+    exported = []
+    written = []
+    failed = False
+    threads, profile = image_options
+    writer = ImageWriter(threads, PNG_PROFILES[profile], log)
+    log(f"Reading: {file_path}")
+    try:
+        env = UnityPy.load(file_path)
+
+        for asset_path, obj in env.container.items():
+            if asset_path in textures:
+                if obj.type.name in ['Texture2D','Sprite']:
+                    data = obj.read()
+                    if obj.type.name == 'Sprite':
+                        # Get the original texture associated with this Sprite
+                        data = data.m_RD.texture.read()
+                    os.makedirs(textures_dir, exist_ok=True)
+                    texture_save_name = asset_path if asset_path.endswith('.png') else asset_path + '.png'
+                    path = os.path.join(textures_dir, os.path.basename(texture_save_name))
+                    log(f"Writing texture: {path}")
+                    writer.submit(texture_decoder(data), path)
+                    textures_num += 1
+                    exported.append(asset_path)
+                    written.append(path)
+                elif obj.type.name == 'SpriteAtlas':
+                    pages = export_sprite_atlas(env, obj, asset_path, textures_dir, writer, log)
+                    if pages:
+                        textures_num += 1
+                        written.extend(pages)
+                    exported.append(asset_path)
+    except Exception as e:
+        log(f"ERROR processing texture bundle {bundle_name}: {str(e)}")
+        log(traceback.format_exc())
+        failed = True
+    finally:
+        if writer.close():
+            failed = True
+    result = {'textures_num': textures_num, 'exported': exported, 'files': written}
+    if failed:
+        result['failed'] = True
+    return result
+
+
+class ExportManifest:
+    """
+    Incremental export state: for every stage, which bundle (by content hash)
+    produced which result. Bundles whose hash is unchanged - and whose output
+    files still exist - are not exported again; their stored result is merged
+    into strings.json and the [SUMMARY] exactly like a fresh one.
+
+    Each stage also carries a settings key (output directories, textures
+    list, ...); when it changes, all stored results of the stage are dropped.
+    """
+
+    FORMAT = 'export-manifest'
+    # bump whenever the export routines change what they produce
+    VERSION = 2
+
+    # result keys holding paths of output files that must still exist
+    OUTPUT_KEYS = ('dialogues', 'files')
+
+    def __init__(self, path, log):
+        self.path = path
+        self.log = log
+        self._stages = {}
+        self._current = {}  # stage -> {bundle name: entry} seen in this run
+        payload = load_state(path, self.FORMAT, self.VERSION, log, 'export manifest',
+                             'exporting everything')
+        if payload is not None:
+            self._stages = payload.get('stages', {})
+
+    def begin_stage(self, stage, settings):
+        """Start a stage - stored results are only usable when they were
+        produced with the same settings."""
+        stored = self._stages.get(stage)
+        if stored is None or stored.get('settings') != settings:
+            stored = {'settings': settings, 'bundles': {}}
+            self._stages[stage] = stored
+        self._current[stage] = {}
+
+    def lookup(self, stage, bundle_name, bundle_hash):
+        """Stored result of an unchanged bundle, None when it must be exported."""
+        entry = self._stages[stage]['bundles'].get(bundle_name)
+        if entry is None or bundle_hash is None or entry['hash'] != bundle_hash:
+            return None
+        result = entry['result']
+        for key in self.OUTPUT_KEYS:
+            if not all(os.path.isfile(p) for p in result.get(key, [])):
+                return None
+        self._current[stage][bundle_name] = entry
+        return result
+
+    def record(self, stage, bundle_name, bundle_hash, result):
+        if bundle_hash is None or result.get('failed'):
+            return
+        self._current[stage][bundle_name] = {'hash': bundle_hash, 'result': result}
+
+    def save(self):
+        """Persist the manifest. Stages that ran keep only the bundles seen
+        in this run; stages that didn't run are kept as they were."""
+        for stage, bundles in self._current.items():
+            self._stages[stage]['bundles'] = bundles
+        save_state(self.path, self.FORMAT, self.VERSION, stages=self._stages)
@@ -1,10 +1,31 @@
 import os
+import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 from tqdm import tqdm
 import UnityPy
 import traceback
-from datetime import datetime
+from functools import partial
+
+# the bundle catalog is shared with the bbb function
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '6-boom-boom-build'))
+from catalog import BundleCatalog
+from addressables import AddressablesCatalog, bundles_holding
+from asset_locator import find_monobehaviour, read_unity_version
+from runlog import RunLog
+from string_index import StringIndex
+
+from exporter import (
+    PNG_PROFILES,
+    ExportManifest,
+    init_worker,
+    run_collecting,
+    write_json,
+    export_scene_bundle,
+    export_dialogue_bundle,
+    export_texture_bundle,
+)
 
 # For debugging/development purposes
 EXPORT_MAIN = True
@@ -13,14 +34,17 @@ EXPORT_DIALOGUES = True
 EXPORT_TEXTURES = True
 
 log_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Logs', '1-exporter.log')
-os.makedirs(os.path.dirname(log_path), exist_ok=True)
-open(log_path, 'w').close()
+json_log_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Logs', '1-exporter.jsonl')
+catalog_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Cache', 'bundle-catalog.json')
+manifest_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Cache', 'export-manifest.json')
+locator_cache_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Cache', 'asset-locator.json')
+string_index_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Cache', 'string-index.json')
 
-def log(message):
-    from datetime import datetime
-    with open(log_path, 'a', encoding='utf-8') as log_file:
-        timestamp = datetime.now().strftime('[%Y-%m-%d %H:%M:%S]')
-        log_file.write(f"{timestamp} {message}\n")
+# created in main() - worker processes re-import this module
+run_log = None
+
+def log(message, **fields):
+    run_log(message, **fields)
 
 def tqdm_wrap(iterable, desc):
     bar_format = "{desc:<21}{percentage:3.0f}%|{bar}{r_bar}"
@@ -29,18 +53,6 @@ def tqdm_wrap(iterable, desc):
     else:
         return tqdm(iterable=iterable, desc=desc, bar_format=bar_format)
 
-log("==== FUNCTION STARTED ====")
-
-load_dotenv('../../.env')
-
-if os.getenv('SKIP_TEXTURES', '').lower() == 'true':
-    EXPORT_TEXTURES = False
-    log("SKIP_TEXTURES is enabled - texture export disabled")
-
-# Suppress UnityVersionFallbackWarning since we're explicitly setting the fallback version
-import warnings
-warnings.filterwarnings("ignore", category=UnityPy.config.UnityVersionFallbackWarning)
-
 # Handle both relative and absolute paths
 def get_path(env_var):
     path = os.getenv(env_var)
@@ -48,16 +60,26 @@ def get_path(env_var):
         return path
     return os.path.join('../', '../', path)
 
-data_dir = get_path('GAME_DATA_DIR')
-res_dir = get_path('RES_DIR')
-textures_dir = get_path('TEXTURES_DIR')
-
-log(f"Paths configured - Data: {data_dir}, Resources: {res_dir}, Textures: {textures_dir}")
+def get_workers():
+    """WORKERS from .env: 1 (default) exports serially in this process,
+    0 uses one worker process per CPU core, anything else is the pool size."""
+    value = os.getenv('WORKERS', '').strip()
+    try:
+        workers = int(value) if value else 1
+    except ValueError:
+        log(f"Warning: WORKERS '{value}' is not a number, exporting serially")
+        return 1
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
 
 # Auto-detect Unity version from resources.assets
 def detect_unity_version(game_data_dir):
+    resources_path = os.path.join(game_data_dir, 'resources.assets')
+    unity_version = read_unity_version(resources_path)
+    if unity_version:
+        return unity_version
     try:
-        resources_path = os.path.join(game_data_dir, 'resources.assets')
         env = UnityPy.load(resources_path)
         for sf in env.files.values():
             if hasattr(sf, 'unity_version') and sf.unity_version:
@@ -66,254 +88,246 @@ def detect_unity_version(game_data_dir):
         pass
     return None
 
-unity_version = detect_unity_version(data_dir)
-if not unity_version or not unity_version.startswith('6000'):
-    print(f"Error: this game version is not supported (detected: {unity_version})")
-    log(f"ERROR: unsupported Unity version: {unity_version}")
-    exit(1)
-
-UnityPy.config.FALLBACK_UNITY_VERSION = unity_version
-log(f"Unity version detected: {unity_version}")
-
-strings_num = 0
-textures_num = 0
-dialogues_num = 0
-
-if os.getenv('UNITYPY_USE_PYTHON_PARSER') == 'true':
-    from UnityPy.helpers import TypeTreeHelper
-    TypeTreeHelper.read_typetree_boost = False
-    log("Using Python parser for TypeTree")
-
-textures_list_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Data/textures.list')
-log(f"Reading textures list from: {textures_list_path}")
-with open(textures_list_path, 'r', encoding='utf-8') as f:
-    textures = [line.strip() for line in f.readlines()]
-    log(f"Loaded {len(textures)} textures from list")
-
-streaming_assets_path = os.path.join('StreamingAssets', 'aa', 'StandaloneWindows64')
-bundle_dir = os.path.join(data_dir, streaming_assets_path)
-dialogue_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and '_other_' in f]
-texture_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and '_texture_' in f]
-scene_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and '_scenes_' in f]
-atlas_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and 'spriteatlas' in f.lower()]
-
-log(f"Found {len(dialogue_bundles)} dialogue bundles, {len(texture_bundles)} texture bundles, {len(scene_bundles)} scene bundles, {len(atlas_bundles)} sprite atlas bundles")
-
-typetree_path = os.path.join(os.path.dirname(__file__), os.path.join('../', '../', 'Data/I2.loc.typetree.json'))
-log(f"Reading typetree from: {typetree_path}")
-with open(typetree_path, 'r', encoding='utf-8') as f:
-    I2LocTypetree = json.load(f)
-    log("Loaded I2.loc.typetree.json")
-
-if EXPORT_MAIN:
-    print('Exporting I2Languages: ',end='')
-    file_path = os.path.join(data_dir, 'resources.assets')
-    log(f"Reading: {file_path}")
-    try:
-        env = UnityPy.load(file_path)
-        found = False
-        for obj in env.objects:
-            if obj.type.name == 'MonoBehaviour':
-                try:
-                    data = obj.read(check_read=False)
-                    if getattr(data, 'm_Name') == "I2Languages":
-                        found = True
-                except:
-                    continue
-                if found:
-                    typetree = obj.read_typetree(I2LocTypetree['I2.Loc.LanguageSourceAsset'])
-                    json_data = json.dumps(typetree, indent=2, ensure_ascii=False)
-                    os.makedirs(res_dir, exist_ok=True)
-                    i2_output_path = os.path.join(res_dir, "I2Languages.json")
-                    log(f"Writing: {i2_output_path}")
-                    with open(i2_output_path, 'w', encoding='utf-8') as f:
-                        f.write(json_data)
-                    print('1/1')
-                    log("Successfully exported I2Languages")
-                    break
-
-        if not found:
-            print('failed')
-            log("ERROR: I2Languages not found in resources.assets")
-            exit(1)
-    except Exception as e:
-        log(f"ERROR processing I2Languages: {str(e)}")
-        log(traceback.format_exc())
-        print('failed')
+def refresh_catalog(catalog):
+    """Bring the bundle catalog up to date, with a progress bar."""
+    bar_format = "{desc:<21}{percentage:3.0f}%|{bar}{r_bar}"
+    with tqdm(desc='Cataloging bundles:', bar_format=bar_format) as bar:
+        def on_progress(current, total):
+            bar.total = total
+            bar.n = current
+            bar.refresh()
+        catalog.refresh(on_progress=on_progress)
+
+def export_bundles(pool, func, bundle_dir, bundle_names, desc, *args):
+    """Run an export routine over bundles and yield its results in bundle
+    order - directly in this process when there is no pool, otherwise in
+    the worker processes (their log lines are written here, in order)."""
+    if pool is None:
+        for bundle_name in tqdm_wrap(iterable=bundle_names, desc=desc):
+            yield func(os.path.join(bundle_dir, bundle_name), *args,
+                       log=partial(log, bundle=bundle_name))
+        return
+    futures = [pool.submit(run_collecting, func, os.path.join(bundle_dir, bundle_name), *args)
+               for bundle_name in bundle_names]
+    for bundle_name, future in zip(bundle_names, tqdm_wrap(iterable=futures, desc=desc)):
+        result = future.result()
+        run_log.write_records(result.pop('log'), bundle=bundle_name)
+        yield result
+
+def export_stage(pool, manifest, catalog, stage, func, bundle_names, desc, *args):
+    """export_bundles with incremental mode on top: when a manifest is given,
+    unchanged bundles yield their stored result instead of being exported
+    and freshly exported ones are recorded. Yields (bundle name, result)."""
+    run_log.set_context(stage=stage)
+    pending = bundle_names
+    if manifest is not None:
+        pending = []
+        for bundle_name in bundle_names:
+            result = manifest.lookup(stage, bundle_name, catalog.bundle_hash(bundle_name))
+            if result is None:
+                pending.append(bundle_name)
+            else:
+                yield bundle_name, result
+        log(f"Incremental {stage} export: {len(bundle_names) - len(pending)} unchanged bundle(s) "
+            f"reused, {len(pending)} to export")
+    results = export_bundles(pool, func, catalog.bundle_dir, pending, desc, *args)
+    for bundle_name, result in zip(pending, results):
+        if manifest is not None:
+            manifest.record(stage, bundle_name, catalog.bundle_hash(bundle_name), result)
+        yield bundle_name, result
+
+def main():
+    global EXPORT_TEXTURES, run_log
+
+    run_log = RunLog(log_path)
+    log("==== FUNCTION STARTED ====")
+
+    load_dotenv('../../.env')
+    run_log.configure(level=os.getenv('LOG_LEVEL'),
+                      json_path=json_log_path if os.getenv('LOG_JSON', '').lower() == 'true' else None)
+
+    if os.getenv('SKIP_TEXTURES', '').lower() == 'true':
+        EXPORT_TEXTURES = False
+        log("SKIP_TEXTURES is enabled - texture export disabled")
+
+    # Suppress UnityVersionFallbackWarning since we're explicitly setting the fallback version
+    import warnings
+    warnings.filterwarnings("ignore", category=UnityPy.config.UnityVersionFallbackWarning)
+
+    data_dir = get_path('GAME_DATA_DIR')
+    res_dir = get_path('RES_DIR')
+    textures_dir = get_path('TEXTURES_DIR')
+
+    log(f"Paths configured - Data: {data_dir}, Resources: {res_dir}, Textures: {textures_dir}")
+
+    unity_version = detect_unity_version(data_dir)
+    if not unity_version or not unity_version.startswith('6000'):
+        print(f"Error: this game version is not supported (detected: {unity_version})")
+        log(f"ERROR: unsupported Unity version: {unity_version}")
         exit(1)
 
-if EXPORT_STRINGS:
-    strings = {}
-    for bundle_name in tqdm_wrap(iterable=scene_bundles, desc='Exporting strings:'):
-        file_path = os.path.join(bundle_dir, bundle_name)
-        log(f"Reading: {file_path}")
-        
-        try:
-            env = UnityPy.load(file_path)
-            bundle_dest = os.path.join(res_dir, os.path.basename(bundle_name))
-
-            for obj in env.objects:
-                if obj.type.name == 'MonoBehaviour':
-                    if not obj.serialized_type.nodes:
-                        continue
-                    try:
-                        tree = obj.read_typetree()
-                        # Detect world-space TextMeshPro by structure (script pointer may be cross-bundle)
-                        # World-space TMP has _SortingLayer/_SortingOrder fields; TextMeshProUGUI does not
-                        if 'm_text' in tree and 'm_fontAsset' in tree and '_SortingLayer' in tree:
-                            strings[tree['m_text'].replace('\t', '\\t').replace('\n', '\\n')] = ""
-                    except Exception as inner_e:
-                        log(f"Error processing object in {bundle_name}: {str(inner_e)}")
-                        continue
-        except Exception as e:
-            log(f"ERROR processing bundle {bundle_name}: {str(e)}")
-            log(traceback.format_exc())
-
-    strings = dict(sorted(strings.items()))
-    strings_num = len(strings)
-    strings_output_path = os.path.join(res_dir, "strings.json")
-    log(f"Writing {strings_num} strings to: {strings_output_path}")
-    with open(strings_output_path, 'w', encoding='utf-8') as f:
-        f.write(json.dumps(strings, indent=2, ensure_ascii=False))
-
-if EXPORT_DIALOGUES:
-    for bundle_name in tqdm_wrap(iterable=dialogue_bundles, desc='Exporting dialogues:'):
-        file_path = os.path.join(bundle_dir, bundle_name)
+    UnityPy.config.FALLBACK_UNITY_VERSION = unity_version
+    log(f"Unity version detected: {unity_version}")
+
+    strings_num = 0
+    textures_num = 0
+    dialogues_num = 0
+
+    use_python_parser = os.getenv('UNITYPY_USE_PYTHON_PARSER') == 'true'
+    if use_python_parser:
+        from UnityPy.helpers import TypeTreeHelper
+        TypeTreeHelper.read_typetree_boost = False
+        log("Using Python parser for TypeTree")
+
+    workers = get_workers()
+    log(f"Using {workers} worker process(es)" if workers > 1 else "Exporting serially")
+
+    export_profile = os.getenv('EXPORT_PROFILE', '').lower() or 'release'
+    if export_profile not in PNG_PROFILES:
+        log(f"Warning: unknown EXPORT_PROFILE '{export_profile}', using 'release'")
+        export_profile = 'release'
+    # PNG encoding threads per process - the worker processes share the cores
+    image_options = (max(1, (os.cpu_count() or 1) // workers), export_profile)
+    log(f"Texture export profile: {export_profile}, {image_options[0]} encoding thread(s) per process")
+
+    manifest = None
+    if os.getenv('INCREMENTAL', '').lower() == 'true':
+        manifest = ExportManifest(manifest_path, log)
+        log("INCREMENTAL is enabled - unchanged bundles are not exported again")
+
+    textures_list_path = os.path.join(os.path.dirname(__file__), '../', '../', 'Data/textures.list')
+    log(f"Reading textures list from: {textures_list_path}")
+    with open(textures_list_path, 'r', encoding='utf-8') as f:
+        textures = [line.strip() for line in f.readlines()]
+        log(f"Loaded {len(textures)} textures from list")
+
+    streaming_assets_path = os.path.join('StreamingAssets', 'aa', 'StandaloneWindows64')
+    bundle_dir = os.path.join(data_dir, streaming_assets_path)
+    dialogue_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and '_other_' in f]
+    texture_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and '_texture_' in f]
+    scene_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and '_scenes_' in f]
+    atlas_bundles = [f for f in os.listdir(bundle_dir) if f.endswith('.bundle') and 'spriteatlas' in f.lower()]
+
+    log(f"Found {len(dialogue_bundles)} dialogue bundles, {len(texture_bundles)} texture bundles, {len(scene_bundles)} scene bundles, {len(atlas_bundles)} sprite atlas bundles")
+
+    # open only the bundles that can hold something to export
+    catalog = BundleCatalog(bundle_dir, catalog_path, log_fn=log)
+    refresh_catalog(catalog)
+    dialogue_bundles = catalog.dialogue_bundles(dialogue_bundles)
+    texture_bundles = catalog.texture_bundles(texture_bundles)
+    scene_bundles = catalog.tmp_bundles(scene_bundles)
+    atlas_bundles = catalog.texture_bundles(atlas_bundles)
+    if EXPORT_TEXTURES:
+        # resolve the listed textures to the bundles actually holding them
+        addressables = AddressablesCatalog.find(data_dir, log_fn=log)
+        texture_bundles = bundles_holding(textures, texture_bundles, addressables, catalog)
+        atlas_bundles = bundles_holding(textures, atlas_bundles, addressables, catalog)
+
+    log(f"Bundles to open: {len(dialogue_bundles)} dialogue, {len(texture_bundles)} texture, {len(scene_bundles)} scene, {len(atlas_bundles)} sprite atlas")
+
+    typetree_path = os.path.join(os.path.dirname(__file__), os.path.join('../', '../', 'Data/I2.loc.typetree.json'))
+    log(f"Reading typetree from: {typetree_path}")
+    with open(typetree_path, 'r', encoding='utf-8') as f:
+        I2LocTypetree = json.load(f)
+        log("Loaded I2.loc.typetree.json")
+
+    if EXPORT_MAIN:
+        print('Exporting I2Languages: ',end='')
+        file_path = os.path.join(data_dir, 'resources.assets')
         log(f"Reading: {file_path}")
         try:
             env = UnityPy.load(file_path)
-            bundle_dest = os.path.join(res_dir, os.path.basename(bundle_name))
-
-            # Build a path_id -> asset_path lookup from the container
-            pathid_to_asset = {}
-            for asset_path, obj in env.container.items():
-                pathid_to_asset[obj.path_id] = asset_path
-
-            for obj in env.objects:
-                if obj.type.name != 'MonoBehaviour':
-                    continue
-                # Only process objects with an embedded typetree
-                if not obj.serialized_type.nodes:
-                    continue
-                try:
-                    typetree = obj.read_typetree()
-                except Exception as e:
-                    log(f"Warning: failed to read typetree in {bundle_name}: {str(e)}")
-                    continue
-
-                # Detect DialogueDatabase by structure (script pointer is cross-bundle)
-                if not ('conversations' in typetree and 'actors' in typetree and 'items' in typetree):
-                    continue
-
-                asset_path = pathid_to_asset.get(obj.path_id, '')
-
-                if 'DialogueDatabaseArchive' in asset_path: # skip archived convos
-                    continue
-
-                json_data = json.dumps(typetree, indent=2, ensure_ascii=False)
-
-                # build destination path
-                if asset_path:
-                    asset_dir = os.path.join(bundle_dest, os.path.dirname(asset_path))
-                    filename = os.path.basename(asset_path) + ".json"
-                else:
-                    # fallback: use m_Name
-                    m_name = typetree.get('m_Name', f'dialogue_{obj.path_id}')
-                    asset_dir = bundle_dest
-                    filename = m_name + ".json"
-
-                os.makedirs(asset_dir, exist_ok=True)
-                output_path = os.path.join(asset_dir, filename)
-                log(f"Writing dialogue: {output_path}")
-
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(json_data)
-
-                dialogues_num += 1
+            obj = find_monobehaviour(env.file, file_path, 'I2Languages', locator_cache_path, log)
+            if obj is None:
+                print('failed')
+                log("ERROR: I2Languages not found in resources.assets")
+                exit(1)
+
+            typetree = obj.read_typetree(I2LocTypetree['I2.Loc.LanguageSourceAsset'])
+            os.makedirs(res_dir, exist_ok=True)
+            i2_output_path = os.path.join(res_dir, "I2Languages.json")
+            log(f"Writing: {i2_output_path}")
+            write_json(i2_output_path, typetree)
+            print('1/1')
+            log("Successfully exported I2Languages")
         except Exception as e:
-            log(f"ERROR processing dialogue bundle {bundle_name}: {str(e)}")
+            log(f"ERROR processing I2Languages: {str(e)}")
             log(traceback.format_exc())
+            print('failed')
+            exit(1)
+        env = None
 
-def export_sprite_atlas(env, obj, asset_path):
-    """Export the packed texture page(s) of a SpriteAtlas as PNG(s).
-
-    Output layout:
-      TEXTURES_DIR/<AtlasName>.png       - the atlas texture (single page)
-      TEXTURES_DIR/<AtlasName>#<n>.png   - extra pages, if any
-    """
-    global textures_num
-    atlas_name = os.path.basename(asset_path).replace('.spriteatlas', '')
-    data = obj.read()
-    pathid_to_obj = {o.path_id: o for o in env.objects}
-
-    # decode each atlas page once
-    pages = []
-    seen = set()
-    for _, rd in data.m_RenderDataMap:
-        tex_ref = rd.texture
-        pid = tex_ref.m_PathID
-        if tex_ref.m_FileID != 0 or pid not in pathid_to_obj:
-            log(f"Warning: atlas {atlas_name} references an external texture "
-                f"(fileID={tex_ref.m_FileID}, pathID={pid}), skipping page")
-            continue
-        if pid not in seen:
-            seen.add(pid)
-            pages.append(pathid_to_obj[pid].read().image)
-
-    if not pages:
-        log(f"Warning: atlas {atlas_name} has no decodable texture pages")
-        return
-
-    os.makedirs(textures_dir, exist_ok=True)
-    for idx, img in enumerate(pages):
-        suffix = '' if len(pages) == 1 else f'#{idx}'
-        full_path = os.path.join(textures_dir, f"{atlas_name}{suffix}.png")
-        log(f"Writing atlas texture: {full_path}")
-        img.save(full_path)
-
-    textures_num += 1
-
-if EXPORT_TEXTURES:
-    exported_textures = set()
-    for bundle_name in tqdm_wrap(iterable=texture_bundles + atlas_bundles, desc='Exporting textures:'):
-        file_path = os.path.join(bundle_dir, bundle_name)
-        log(f"Reading: {file_path}")
-        try:
-            env = UnityPy.load(file_path)
-            bundle_dest = os.path.join(res_dir, os.path.basename(bundle_name))
-
-            for asset_path, obj in env.container.items():
-                if asset_path in textures:
-                    if obj.type.name in ['Texture2D','Sprite']:
-                        data = obj.read()
-                        if obj.type.name == 'Sprite':
-                            # Get the original texture associated with this Sprite
-                            data = data.m_RD.texture.read()
-                        os.makedirs(textures_dir, exist_ok=True)
-                        texture_save_name = asset_path if asset_path.endswith('.png') else asset_path + '.png'
-                        path = os.path.join(textures_dir, os.path.basename(texture_save_name))
-                        log(f"Writing texture: {path}")
-                        data.image.save(path)
-                        textures_num += 1
-                        exported_textures.add(asset_path)
-                    elif obj.type.name == 'SpriteAtlas':
-                        export_sprite_atlas(env, obj, asset_path)
-                        exported_textures.add(asset_path)
-        except Exception as e:
-            log(f"ERROR processing texture bundle {bundle_name}: {str(e)}")
-            log(traceback.format_exc())
-    missing_textures = sorted(list(set(textures) - exported_textures))
-    log(f"Textures not exported: {', '.join(missing_textures)}")
-else:
-    missing_textures = []
+    # the pool is created only when it's needed - WORKERS=1 keeps the
+    # original single-process path
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(unity_version, use_python_parser))
 
-summary = f"""
+    try:
+        if EXPORT_STRINGS:
+            strings = {}
+            if manifest is not None:
+                manifest.begin_stage('strings', {})
+            # rebuilt as a whole - bundles that failed stay out of it and
+            # are simply scanned in full by the patcher
+            string_index = StringIndex(string_index_path, log_fn=log, load=False)
+            for bundle_name, result in export_stage(pool, manifest, catalog, 'strings',
+                                                    export_scene_bundle, scene_bundles,
+                                                    'Exporting strings:'):
+                for string in result['strings']:
+                    strings[string] = ""
+                if not result.get('failed'):
+                    string_index.set_bundle(bundle_name, catalog.bundle_hash(bundle_name),
+                                            result['occurrences'])
+            log(f"Writing string index for {len(string_index.bundles)} bundle(s) to: {string_index_path}")
+            string_index.save()
+
+            strings = dict(sorted(strings.items()))
+            strings_num = len(strings)
+            strings_output_path = os.path.join(res_dir, "strings.json")
+            log(f"Writing {strings_num} strings to: {strings_output_path}")
+            write_json(strings_output_path, strings)
+
+        if EXPORT_DIALOGUES:
+            if manifest is not None:
+                manifest.begin_stage('dialogues', {'res_dir': os.path.abspath(res_dir)})
+            for _, result in export_stage(pool, manifest, catalog, 'dialogues', export_dialogue_bundle,
+                                          dialogue_bundles, 'Exporting dialogues:', res_dir):
+                dialogues_num += len(result['dialogues'])
+
+        if EXPORT_TEXTURES:
+            exported_textures = set()
+            if manifest is not None:
+                manifest.begin_stage('textures', {'textures_dir': os.path.abspath(textures_dir),
+                                                  'textures': sorted(textures)})
+            for _, result in export_stage(pool, manifest, catalog, 'textures', export_texture_bundle,
+                                          texture_bundles + atlas_bundles, 'Exporting textures:',
+                                          set(textures), textures_dir, image_options):
+                textures_num += result['textures_num']
+                exported_textures.update(result['exported'])
+            missing_textures = sorted(list(set(textures) - exported_textures))
+            log(f"Textures not exported: {', '.join(missing_textures)}")
+        else:
+            missing_textures = []
+    finally:
+        run_log.set_context(stage=None)
+        if pool is not None:
+            pool.shutdown()
+
+    if manifest is not None:
+        manifest.save()
+
+    summary = f"""
 [SUMMARY]
 Exported I2Languages: 1/1
 Exported strings: {strings_num}
 Exported textures: {textures_num}/{len(textures)}
 Exported dialogue databases: {dialogues_num}
 """
-print()
-print(summary.strip())
-log(summary)
\ No newline at end of file
+    print()
+    print(summary.strip())
+    log(summary)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Reader for the game's Addressables content catalog (StreamingAssets/aa/catalog*.json).
+
+Used by the Boom Boom Build patcher (patcher.py) and the Exporter to find the
+bundle files holding an asset path without opening any bundle. find() returns
+None for binary or unparsable catalogs; callers then use catalog.py.
+"""
+
+import os
+import re
+import glob
+import json
+import base64
+import struct
+
+# ContentCatalogData key object types (SerializationUtilities.ObjectType)
+_KEY_ASCII_STRING   = 0
+_KEY_UNICODE_STRING = 1
+_KEY_UINT16         = 2
+_KEY_UINT32         = 3
+_KEY_INT32          = 4
+_KEY_HASH128        = 5
+
+_ENTRY_SIZE = 7
+
+
+def _read_key(data, offset):
+    """Decode one serialized key; non-string keys are returned as None."""
+    key_type = data[offset]
+    offset += 1
+    if key_type == _KEY_ASCII_STRING:
+        length = struct.unpack_from('<i', data, offset)[0]
+        return data[offset + 4:offset + 4 + length].decode('ascii', errors='replace')
+    if key_type == _KEY_UNICODE_STRING:
+        length = struct.unpack_from('<i', data, offset)[0]
+        return data[offset + 4:offset + 4 + length].decode('utf-16-le', errors='replace')
+    if key_type == _KEY_HASH128:
+        length = data[offset]
+        return data[offset + 1:offset + 1 + length].decode('ascii', errors='replace')
+    return None
+
+
+class AddressablesCatalog:
+    """Asset key -> bundle file names lookup over a parsed content catalog."""
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+
+        prefixes = payload.get('m_InternalIdPrefixes') or []
+        internal_ids = []
+        for internal_id in payload['m_InternalIds']:
+            # compressed ids look like "<prefix index>#<rest>"
+            head, sep, rest = internal_id.partition('#')
+            if sep and head.isdigit() and int(head) < len(prefixes):
+                internal_id = prefixes[int(head)] + rest
+            internal_ids.append(internal_id)
+
+        key_data = base64.b64decode(payload['m_KeyDataString'])
+        bucket_data = base64.b64decode(payload['m_BucketDataString'])
+        entry_data = base64.b64decode(payload['m_EntryDataString'])
+
+        entry_count = struct.unpack_from('<i', entry_data, 0)[0]
+        entries = struct.unpack_from(f'<{entry_count * _ENTRY_SIZE}i', entry_data, 4)
+        self._entry_ids = [internal_ids[entries[i * _ENTRY_SIZE]] for i in range(entry_count)]
+        self._entry_deps = [entries[i * _ENTRY_SIZE + 2] for i in range(entry_count)]
+
+        self._buckets = []   # bucket index -> tuple of entry indices
+        self._keys = {}      # string key -> bucket index
+        bucket_count = struct.unpack_from('<i', bucket_data, 0)[0]
+        pos = 4
+        for idx in range(bucket_count):
+            key_offset, count = struct.unpack_from('<ii', bucket_data, pos)
+            pos += 8
+            self._buckets.append(struct.unpack_from(f'<{count}i', bucket_data, pos))
+            pos += 4 * count
+            key = _read_key(key_data, key_offset)
+            if key is not None:
+                self._keys.setdefault(key, idx)
+
+    @classmethod
+    def find(cls, game_data_dir, log_fn=None):
+        """Load the JSON content catalog of a game installation, or None when
+        there is none or it cannot be parsed."""
+        log = log_fn if log_fn else lambda msg: None
+        aa_dir = os.path.join(game_data_dir, 'StreamingAssets', 'aa')
+        paths = sorted(glob.glob(os.path.join(aa_dir, 'catalog*.json')))
+        if not paths:
+            log(f"No Addressables JSON catalog found in {aa_dir}")
+            return None
+        try:
+            catalog = cls(paths[0])
+        except Exception as e:
+            log(f"Warning: failed to parse Addressables catalog '{paths[0]}': {str(e)}")
+            return None
+        log(f"Loaded Addressables catalog: {paths[0]} ({len(catalog._keys)} keys)")
+        return catalog
+
+    def bundles_for(self, key):
+        """File names of the bundles needed to load the asset with this key
+        (its own bundle and the bundles it depends on), None if unknown."""
+        bucket = self._keys.get(key)
+        if bucket is None:
+            return None
+        bundles = set()
+        for entry in self._buckets[bucket]:
+            dep = self._entry_deps[entry]
+            if dep < 0 or dep >= len(self._buckets):
+                continue
+            for dep_entry in self._buckets[dep]:
+                name = re.split(r'[\\/]', self._entry_ids[dep_entry])[-1]
+                if name.endswith('.bundle'):
+                    bundles.add(name)
+        return bundles or None
+
+
+def bundles_holding(asset_paths, candidates, addressables=None, catalog=None):
+    """Narrow candidates (bundle file names) down to the bundles that hold at
+    least one of asset_paths, keeping their order.
+
+    Each path is resolved via the Addressables catalog first, then via the
+    container index of the bundle catalog (bundles it failed to scan are
+    always kept). Without a bundle catalog, a single unresolvable path means
+    all candidates have to be opened."""
+    wanted = set()
+    for asset_path in asset_paths:
+        found = addressables.bundles_for(asset_path) if addressables else None
+        if found is None and catalog is not None:
+            found = catalog.bundles_with_container(asset_path)
+        if found is None:
+            return list(candidates)
+        wanted |= found
+    if catalog is not None:
+        wanted |= {name for name in candidates if catalog.info(name) is None}
+    return [name for name in candidates if name in wanted]
@@ -0,0 +1,102 @@
+"""Cheap lookups in serialized files that avoid parsing the whole file.
+
+Used by the Boom Boom Build patcher (patcher.py), the Exporter and tools to
+read the Unity version of resources.assets from its header and to find the
+I2Languages asset by peeking MonoBehaviour names at their fixed offset.
+"""
+
+import os
+import struct
+
+from state_file import load_state, save_state
+
+LOCATOR_FORMAT = 'asset-locator'
+LOCATOR_VERSION = 1
+
+MONOBEHAVIOUR_NAME_OFFSET = 28
+
+_HEADER_PEEK_SIZE = 256
+
+
+def read_unity_version(file_path):
+    """Unity version of a serialized file read from its header only, None
+    when the header isn't recognized (callers then fall back to loading
+    the file with UnityPy)."""
+    try:
+        with open(file_path, 'rb') as fh:
+            head = fh.read(_HEADER_PEEK_SIZE)
+        version = struct.unpack_from('>I', head, 8)[0]
+    except (OSError, struct.error):
+        return None
+    if version < 9 or version > 100:
+        return None
+    pos = 20 if version < 22 else 48
+    end = head.find(b'\0', pos)
+    if end <= pos:
+        return None
+    try:
+        return head[pos:end].decode('ascii')
+    except UnicodeDecodeError:
+        return None
+
+
+def peek_monobehaviour_name(obj):
+    """m_Name of a MonoBehaviour read from its raw header, None when the
+    data doesn't look like a name."""
+    if obj.byte_size < MONOBEHAVIOUR_NAME_OFFSET + 4:
+        return None
+    reader = obj.reader
+    reader.Position = obj.byte_start + MONOBEHAVIOUR_NAME_OFFSET
+    length = reader.read_int()
+    if length < 0 or length > obj.byte_size - MONOBEHAVIOUR_NAME_OFFSET - 4:
+        return None
+    try:
+        return reader.read_bytes(length).decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def _load_cache(cache_path):
+    payload = load_state(cache_path, LOCATOR_FORMAT, LOCATOR_VERSION)
+    return (payload.get('entries') or {}) if payload is not None else {}
+
+
+def _save_cache(cache_path, entries):
+    save_state(cache_path, LOCATOR_FORMAT, LOCATOR_VERSION, entries=entries)
+
+
+def find_monobehaviour(serialized_file, file_path, name, cache_path=None, log_fn=None):
+    """
+    ObjectReader of the MonoBehaviour called name in serialized_file (loaded
+    from file_path), None when there is none.
+
+    :param cache_path: Optional JSON file remembering the path_id per file
+                       and game build.
+    """
+    log = log_fn if log_fn else lambda msg: None
+    st = os.stat(file_path)
+    key = f"{os.path.basename(file_path)}:{name}"
+    entries = _load_cache(cache_path)
+    entry = entries.get(key)
+
+    if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns:
+        obj = serialized_file.objects.get(entry['path_id'])
+        if obj is not None and obj.type.name == 'MonoBehaviour' \
+                and peek_monobehaviour_name(obj) == name:
+            log(f"Found {name} at cached path_id {obj.path_id}")
+            return obj
+        log(f"Cached path_id of {name} is stale, rescanning")
+
+    for obj in serialized_file.objects.values():
+        if obj.type.name != 'MonoBehaviour' or peek_monobehaviour_name(obj) != name:
+            continue
+        log(f"Found {name} at path_id {obj.path_id}")
+        if cache_path:
+            entries[key] = {'size': st.st_size, 'mtime': st.st_mtime_ns,
+                            'path_id': obj.path_id}
+            try:
+                _save_cache(cache_path, entries)
+            except OSError as e:
+                log(f"Warning: failed to write asset locator cache '{cache_path}': {str(e)}")
+        return obj
+    return None
@@ -0,0 +1,82 @@
+"""Incremental build state of Boom Boom Build.
+
+With INCREMENTAL enabled, the patcher (patcher.py) records the stage, build
+key and output of every bundle, and reuses outputs whose key is unchanged.
+"""
+
+import os
+
+from state_file import load_state, save_state
+
+BUILD_MANIFEST_FORMAT = 'build-manifest'
+# bump whenever the entry layout changes
+BUILD_MANIFEST_VERSION = 3
+
+
+def _output_stat(out_path):
+    try:
+        st = os.stat(out_path)
+    except OSError:
+        return None
+    return {'size': st.st_size, 'mtime': st.st_mtime_ns}
+
+
+class BuildManifest:
+    """
+    Build keys and results of the bundles patched by the previous runs.
+    """
+
+    def __init__(self, path, log_fn=None):
+        """
+        :param path:    JSON file the manifest is stored in.
+        :param log_fn:  Optional callable(message: str) for logging.
+        """
+        self.path = path
+        self.log = log_fn if log_fn else lambda msg: None
+        self.bundles = {}
+        self._current = {}  # bundle name -> entry reused or built in this run
+        self._stages = set()  # stages that ran in this run
+        self._load()
+
+    def _load(self):
+        payload = load_state(self.path, BUILD_MANIFEST_FORMAT, BUILD_MANIFEST_VERSION, self.log,
+                             'build manifest', 'rebuilding everything')
+        if payload is not None:
+            self.bundles = payload.get('bundles') or {}
+
+    def _kept(self):
+        """Entries of this run, plus those of the stages that didn't run."""
+        kept = {name: entry for name, entry in self.bundles.items()
+                if entry['stage'] not in self._stages}
+        kept.update(self._current)
+        return kept
+
+    def save(self):
+        """Persist the manifest - bundles of the stages that ran are only
+        kept when they were reused or built in this run."""
+        save_state(self.path, BUILD_MANIFEST_FORMAT, BUILD_MANIFEST_VERSION, bundles=self._kept())
+
+    def stage_ran(self, stage):
+        """Mark a stage as run - its entries are now replaced by this run's."""
+        self._stages.add(stage)
+
+    def lookup(self, bundle_name, key, out_path):
+        """Entry of a bundle whose previous output can be reused, None when it
+        must be patched again."""
+        entry = self.bundles.get(bundle_name)
+        if entry is None or entry['key'] != key:
+            return None
+        if entry['output'] is not None and _output_stat(out_path) != entry['output']:
+            return None
+        self._current[bundle_name] = entry
+        return entry
+
+    def record(self, bundle_name, stage, key, out_path):
+        """Store the result of a bundle patched in this run (its output, if
+        any, must be written already)."""
+        self._current[bundle_name] = {'stage': stage, 'key': key,
+                                      'output': _output_stat(out_path)}
+
+    def outputs(self):
+        """Names of the bundles whose output belongs to this build."""
+        return {name for name, entry in self._kept().items() if entry['output'] is not None}
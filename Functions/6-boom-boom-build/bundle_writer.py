@@ -0,0 +1,186 @@
+"""Streaming save of patched bundles: the UnityFS layout of
+BundleFile.save(), written block by block into a file handle.
+
+Used by the Boom Boom Build patcher (patcher.py). Anything it can't stream
+(LZMA, other bundle formats, serialized files) is saved by UnityPy.
+Misc/smoke-test-bundle-writer.py checks the output against BundleFile.save().
+"""
+
+import shutil
+import tempfile
+
+from UnityPy.files import BundleFile
+from UnityPy.helpers import CompressionHelper
+from UnityPy.streams import EndianBinaryReader, EndianBinaryWriter
+
+# packer name -> (data flag, block info flag), as in BundleFile.save()
+PACKER_FLAGS = {
+    'none': (64, 64),
+    'lz4':  (194, 2),
+}
+
+# compressed blocks up to this size are spooled in memory, larger ones to disk
+_SPOOL_MEMORY = 16 * 1024 * 1024
+_COPY_CHUNK = 1024 * 1024
+
+
+class _BlockSpool:
+    """Cuts the data of a bundle into blocks, compresses and spools them."""
+
+    def __init__(self, block_info_flag, spool):
+        self.flag = block_info_flag
+        self.switch = block_info_flag & 0x3F
+        self.spool = spool
+        self.blocks = []  # (uncompressed size, compressed size, flag)
+        self.size = 0
+        self._pending = bytearray()
+        if self.switch:
+            self._compress = CompressionHelper.COMPRESSION_MAP[self.switch]
+            self._chunk_size = CompressionHelper.COMPRESSION_CHUNK_SIZE_MAP[self.switch]
+
+    def write(self, data):
+        self.size += len(data)
+        if not self.switch:
+            self.spool.write(data)
+            return
+        view = memoryview(data)
+        pos = 0
+        if self._pending:
+            pos = min(len(view), self._chunk_size - len(self._pending))
+            self._pending += view[:pos]
+            if len(self._pending) < self._chunk_size:
+                return
+            self._block(bytes(self._pending))
+            self._pending = bytearray()
+        while len(view) - pos >= self._chunk_size:
+            self._block(view[pos:pos + self._chunk_size])
+            pos += self._chunk_size
+        self._pending += view[pos:]
+
+    def _block(self, chunk):
+        compressed = self._compress(chunk)
+        if len(compressed) > len(chunk):
+            # incompressible - stored as-is, like UnityPy does
+            self.spool.write(chunk)
+            self.blocks.append((len(chunk), len(chunk), self.flag ^ self.switch))
+        else:
+            self.spool.write(compressed)
+            self.blocks.append((len(chunk), len(compressed), self.flag))
+
+    def close(self):
+        if not self.switch:
+            self.blocks = [(self.size, self.size, self.flag)]
+        elif self._pending:
+            self._block(bytes(self._pending))
+            self._pending = bytearray()
+
+
+def _stream_flags(bundle, packer):
+    """(data flag, block info flag, block alignment) of a bundle that can be
+    streamed, None when it has to be saved by UnityPy."""
+    if not isinstance(bundle, BundleFile) or bundle.signature != 'UnityFS':
+        return None
+    # private BundleFile state (see BundleFile.save_fs) - a UnityPy version
+    # without it is saved by UnityPy itself
+    aligned = getattr(bundle, '_uses_block_alignment', None)
+    if not isinstance(aligned, bool):
+        return None
+    if packer == 'original':
+        block_info_flag = getattr(bundle, '_block_info_flags', None)
+        if block_info_flag is None:
+            return None
+        data_flag, block_info_flag = int(bundle.dataflags), int(block_info_flag)
+    elif packer in PACKER_FLAGS:
+        data_flag, block_info_flag = PACKER_FLAGS[packer]
+    else:
+        return None
+    # encryption isn't done on saving (same as UnityPy)
+    encryption = int(bundle.dataflags.UsesAssetBundleEncryption)
+    data_flag &= ~encryption
+    block_info_flag &= ~encryption
+    switch = block_info_flag & 0x3F
+    if switch and (switch not in CompressionHelper.COMPRESSION_MAP
+                   or CompressionHelper.COMPRESSION_CHUNK_SIZE_MAP.get(switch, 0xFFFFFFFF) >= 0xFFFFFFFF):
+        return None
+    if not data_flag & 0x40 or (data_flag & 0x3F) not in CompressionHelper.COMPRESSION_MAP:
+        return None
+    return data_flag, block_info_flag, aligned
+
+
+def save_file(unity_file, fh, packer='original'):
+    """Save a loaded bundle (env.file) or serialized file into the open
+    binary file handle fh - streamed when possible."""
+    flags = _stream_flags(unity_file, packer)
+    if flags is None:
+        fh.write(unity_file.save(packer=packer))
+        return
+    data_flag, block_info_flag, aligned = flags
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY) as spool:
+        blocks = _BlockSpool(block_info_flag, spool)
+        files = []  # (name, flags, size)
+        for name, f in unity_file.files.items():
+            data = f.bytes if isinstance(f, (EndianBinaryReader, EndianBinaryWriter)) else f.save()
+            blocks.write(data)
+            files.append((name, f.flags, len(data)))
+            data = None
+        blocks.close()
+
+        # block info: uncompressed data hash, data blocks, directory
+        block_writer = EndianBinaryWriter(b"\x00" * 0x10)
+        block_writer.write_int(len(blocks.blocks))
+        for uncompressed_size, compressed_size, flag in blocks.blocks:
+            block_writer.write_u_int(uncompressed_size)
+            block_writer.write_u_int(compressed_size)
+            block_writer.write_u_short(flag)
+        block_writer.write_int(len(files))
+        offset = 0
+        for name, flag, size in files:
+            block_writer.write_long(offset)
+            block_writer.write_long(size)
+            offset += size
+            block_writer.write_u_int(flag)
+            block_writer.write_string_to_null(name)
+        block_data = block_writer.bytes
+        block_writer.dispose()
+        uncompressed_block_data_size = len(block_data)
+        block_data = CompressionHelper.COMPRESSION_MAP[data_flag & 0x3F](block_data)
+
+        writer = EndianBinaryWriter(fh)
+        start = writer.Position
+        writer.write_string_to_null(unity_file.signature)
+        writer.write_u_int(unity_file.version)
+        writer.write_string_to_null(unity_file.version_player)
+        writer.write_string_to_null(unity_file.version_engine)
+        size_pos = writer.Position
+        writer.write_long(0)  # file size, set at the end
+        writer.write_u_int(len(block_data))
+        writer.write_u_int(uncompressed_block_data_size)
+        writer.write_u_int(data_flag)
+        if aligned:
+            _align(writer, start, 16)
+
+        def write_data():
+            if data_flag & 0x200:
+                _align(writer, start, 16)
+            spool.seek(0)
+            shutil.copyfileobj(spool, fh, _COPY_CHUNK)
+            writer.Position = fh.tell()
+
+        if data_flag & 0x80:  # block info at the end of the file
+            write_data()
+            writer.write(block_data)
+        else:
+            writer.write(block_data)
+            write_data()
+
+        end = writer.Position
+        writer.Position = size_pos
+        writer.write_long(end - start)
+        fh.seek(end)
+
+
+def _align(writer, start, alignment):
+    """align_stream relative to where the file starts in the handle."""
+    pos = writer.Position - start
+    writer.write(b"\0" * ((alignment - pos % alignment) % alignment))
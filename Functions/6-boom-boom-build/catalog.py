@@ -0,0 +1,269 @@
+"""Persistent catalog of the game's addressable bundles.
+
+Used by the Boom Boom Build patcher (patcher.py), the Exporter and tools. Per
+bundle it records a fingerprint (size, mtime, hash), its containers, object
+counts per type and whether it holds TMP objects (with their strings.json
+keys) or DialogueDatabases; only bundles whose content changed are rescanned.
+"""
+
+import os
+import hashlib
+import UnityPy
+
+from state_file import load_state, save_state
+from string_index import strings_key
+from tmp_override import TMP_FIELDS
+
+CATALOG_FORMAT = 'bundle-catalog'
+# bump whenever the entry layout or the detection logic changes - caches
+# written by other versions are discarded as a whole
+CATALOG_VERSION = 2
+
+# Structural detection of DialogueDatabases, checked on the type node
+DIALOGUE_DB_FIELDS = ('conversations', 'actors', 'items')
+
+# (type hash, script id, fields) -> has_type_fields result
+_type_fields_cache = {}
+
+TEXTURE_TYPES = ('Texture2D', 'Sprite', 'SpriteAtlas')
+
+# Bundle file name patterns the stages pick their bundles by - scenes
+# (strings, TMP), other (dialogues), texture and sprite atlas bundles
+CANDIDATE_PATTERNS = ('_scenes_', '_other_', '_texture_')
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_hash(path):
+    """sha1 of a file's content, read in chunks."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def is_candidate_bundle(name):
+    """True for the bundle files some stage may open (and so get cataloged)."""
+    if not name.endswith('.bundle'):
+        return False
+    return 'spriteatlas' in name.lower() or any(p in name for p in CANDIDATE_PATTERNS)
+
+
+def top_level_fields(obj):
+    """Names of the top-level typetree fields of an object, taken from its
+    serialized type node (empty when the object has no embedded typetree)."""
+    serialized_type = obj.serialized_type
+    node = serialized_type.nodes if serialized_type else None
+    if not node:
+        return set()
+    return {child.m_Name for child in node.m_Children}
+
+
+def has_type_fields(obj, fields):
+    """True when the serialized type of an object has all of the top-level
+    fields - a structural check that doesn't read the object's data. Objects
+    without an embedded typetree never match (they can't be read anyway).
+
+    Cached per type hash + script id; types without a hash (all zero) are
+    checked every time."""
+    serialized_type = obj.serialized_type
+    if not serialized_type or not serialized_type.nodes:
+        return False
+    type_hash = serialized_type.old_type_hash
+    if not type_hash or not any(type_hash):
+        type_fields = top_level_fields(obj)
+        return all(f in type_fields for f in fields)
+    key = (type_hash, serialized_type.script_id, fields)
+    result = _type_fields_cache.get(key)
+    if result is None:
+        type_fields = top_level_fields(obj)
+        result = _type_fields_cache[key] = all(f in type_fields for f in fields)
+    return result
+
+
+def is_tmp_type(obj):
+    """tmp_override.is_tmp_tree on the serialized type: True when objects of
+    this type can be world-space TMP, so only those get deserialized."""
+    return has_type_fields(obj, TMP_FIELDS)
+
+
+def is_dialogue_db_type(obj):
+    """True when a MonoBehaviour's serialized type is a DialogueDatabase."""
+    return has_type_fields(obj, DIALOGUE_DB_FIELDS)
+
+
+def scan_bundle(file_path):
+    """Collect the catalog info of a single bundle (without fingerprint)."""
+    env = UnityPy.load(file_path)
+    types = {}
+    pathid_to_type = {}
+    has_tmp = False
+    has_dialogue_db = False
+    tmp_texts = set()
+    for obj in env.objects:
+        type_name = obj.type.name
+        types[type_name] = types.get(type_name, 0) + 1
+        pathid_to_type[obj.path_id] = type_name
+        if type_name != 'MonoBehaviour':
+            continue
+        if not has_dialogue_db and is_dialogue_db_type(obj):
+            has_dialogue_db = True
+        if is_tmp_type(obj):
+            has_tmp = True
+            try:
+                tmp_texts.add(strings_key(obj.read_typetree()['m_text']))
+            except Exception:
+                # unreadable here means unpatchable for the patcher as well
+                continue
+    containers = [[asset_path, ptr.path_id, pathid_to_type.get(ptr.path_id, '')]
+                  for asset_path, ptr in env.container.items()]
+    return {
+        'containers': containers,
+        'types': types,
+        'has_tmp': has_tmp,
+        'has_dialogue_db': has_dialogue_db,
+        'tmp_texts': sorted(tmp_texts),
+    }
+
+
+class BundleCatalog:
+    """
+    Catalog of the bundles in one bundle directory.
+
+    refresh() brings the catalog up to date with the files on disk and
+    persists it; the query helpers below then answer "which bundles can
+    hold X" without loading any bundle.
+    """
+
+    def __init__(self, bundle_dir, cache_path=None, log_fn=None):
+        """
+        :param bundle_dir:  StreamingAssets/aa/StandaloneWindows64 directory.
+        :param cache_path:  Optional JSON file the catalog is persisted to.
+                            Without it the catalog lives in memory only.
+        :param log_fn:      Optional callable(message: str) for logging.
+        """
+        self.bundle_dir = bundle_dir
+        self.cache_path = cache_path
+        self.log = log_fn if log_fn else lambda msg: None
+        self.entries = {}
+        self._container_index = None  # asset path -> bundle names, built lazily
+        self._load_cache()
+
+    def _load_cache(self):
+        payload = load_state(self.cache_path, CATALOG_FORMAT, CATALOG_VERSION, self.log,
+                             'bundle catalog', 'rebuilding')
+        if payload is not None and isinstance(payload.get('bundles'), dict):
+            self.entries = payload['bundles']
+
+    def save(self):
+        """Persist the catalog to cache_path."""
+        if self.cache_path:
+            save_state(self.cache_path, CATALOG_FORMAT, CATALOG_VERSION, bundles=self.entries)
+
+    def refresh(self, on_progress=None, name_filter=is_candidate_bundle):
+        """Rescan new and changed bundles, drop removed ones and persist the
+        result. Only bundles passing name_filter are scanned - by default the
+        candidate bundles of the stages, None scans all of them.
+        on_progress(current, total) is called for every bundle.
+        Returns the number of bundles that had to be rescanned."""
+        on_disk = {f for f in os.listdir(self.bundle_dir) if f.endswith('.bundle')}
+        names = sorted(f for f in on_disk if name_filter is None or name_filter(f))
+        total = len(names)
+        rescanned = 0
+        for idx, name in enumerate(names):
+            if on_progress:
+                on_progress(idx, total)
+            file_path = os.path.join(self.bundle_dir, name)
+            st = os.stat(file_path)
+            entry = self.entries.get(name)
+            if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns:
+                continue
+            digest = file_hash(file_path)
+            if entry and entry['hash'] == digest:
+                # touched but identical (e.g. re-installed) - keep the info
+                entry['size'], entry['mtime'] = st.st_size, st.st_mtime_ns
+                continue
+            self.log(f"Cataloging bundle: {file_path}")
+            try:
+                info = scan_bundle(file_path)
+            except Exception as e:
+                # keep it in the catalog as "unknown" so callers fall back to
+                # loading it instead of silently dropping it
+                self.log(f"Warning: failed to catalog bundle {name}: {str(e)}")
+                info = None
+            self.entries[name] = {'size': st.st_size, 'mtime': st.st_mtime_ns,
+                                  'hash': digest, 'info': info}
+            rescanned += 1
+        removed = set(self.entries) - on_disk
+        for name in removed:
+            del self.entries[name]
+        if on_progress:
+            on_progress(total, total)
+        if rescanned or removed:
+            self._container_index = None
+            self.log(f"Bundle catalog updated: {rescanned} bundle(s) rescanned, "
+                     f"{len(removed)} removed, {total} total")
+            self.save()
+        return rescanned
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def names(self):
+        return sorted(self.entries)
+
+    def info(self, name):
+        """Catalog info of a bundle, None when unknown (failed to scan)."""
+        entry = self.entries.get(name)
+        return entry['info'] if entry else None
+
+    def bundle_hash(self, name):
+        entry = self.entries.get(name)
+        return entry['hash'] if entry else None
+
+    def _select(self, names, predicate):
+        """Filter bundle names by a predicate on their info. Bundles with
+        unknown info are always kept - better load one too many."""
+        selected = []
+        for name in names:
+            info = self.info(name)
+            if info is None or predicate(info):
+                selected.append(name)
+        return selected
+
+    def tmp_bundles(self, names):
+        """Bundles among names that can hold world-space TMP objects."""
+        return self._select(names, lambda info: info['has_tmp'])
+
+    def bundles_with_tmp_texts(self, names, keys):
+        """Bundles among names holding a TMP object whose strings.json key is
+        in keys."""
+        return self._select(names, lambda info: not keys.isdisjoint(info['tmp_texts']))
+
+    def dialogue_bundles(self, names):
+        """Bundles among names that can hold DialogueDatabases."""
+        return self._select(names, lambda info: info['has_dialogue_db'])
+
+    def texture_bundles(self, names):
+        """Bundles among names with Texture2D/Sprite/SpriteAtlas containers."""
+        return self._select(names, lambda info: any(
+            type_name in TEXTURE_TYPES for _, _, type_name in info['containers']))
+
+    def bundles_with_type(self, names, type_name):
+        """Bundles among names holding at least one object of type_name."""
+        return self._select(names, lambda info: info['types'].get(type_name, 0) > 0)
+
+    def bundles_with_container(self, asset_path):
+        """Names of the bundles with a container entry for asset_path (empty
+        when the asset is in no cataloged bundle)."""
+        if self._container_index is None:
+            index = {}
+            for name, entry in self.entries.items():
+                if entry['info'] is None:
+                    continue
+                for container_path, _, _ in entry['info']['containers']:
+                    index.setdefault(container_path, set()).add(name)
+            self._container_index = index
+        return set(self._container_index.get(asset_path, ()))
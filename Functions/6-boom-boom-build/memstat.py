@@ -0,0 +1,120 @@
+"""Process and system memory figures for the Boom Boom Build patcher.
+
+Standard library only; every function returns bytes, or None when the figure
+can't be read on this platform.
+"""
+
+import os
+import sys
+
+
+def process_rss():
+    """Resident set size of the current process."""
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+    if os.name == 'nt':
+        counters = _win_process_memory()
+        return counters.WorkingSetSize if counters is not None else None
+    try:
+        import resource
+    except ImportError:
+        return None
+    # peak rather than current RSS - bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def available_memory():
+    """Memory that new processes can still use: the system's available
+    memory, capped by the cgroup limit of a container (CI runners)."""
+    available = None
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        available = int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            pass
+        cgroup = _cgroup_headroom()
+        if cgroup is not None:
+            available = cgroup if available is None else min(available, cgroup)
+    elif os.name == 'nt':
+        status = _win_memory_status()
+        if status is not None:
+            available = status.ullAvailPhys
+    return available
+
+
+def _cgroup_headroom():
+    """Limit minus usage of the cgroup (v2) this process runs in."""
+    try:
+        with open('/sys/fs/cgroup/memory.max', 'r') as f:
+            limit = f.read().strip()
+        if limit == 'max':
+            return None
+        with open('/sys/fs/cgroup/memory.current', 'r') as f:
+            current = int(f.read().strip())
+        return max(0, int(limit) - current)
+    except (OSError, ValueError):
+        return None
+
+
+def _win_process_memory():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    try:
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return counters
+
+
+def _win_memory_status():
+    import ctypes
+    from ctypes import wintypes
+
+    class MEMORYSTATUSEX(ctypes.Structure):
+        _fields_ = [
+            ('dwLength', wintypes.DWORD),
+            ('dwMemoryLoad', wintypes.DWORD),
+            ('ullTotalPhys', ctypes.c_ulonglong),
+            ('ullAvailPhys', ctypes.c_ulonglong),
+            ('ullTotalPageFile', ctypes.c_ulonglong),
+            ('ullAvailPageFile', ctypes.c_ulonglong),
+            ('ullTotalVirtual', ctypes.c_ulonglong),
+            ('ullAvailVirtual', ctypes.c_ulonglong),
+            ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+        ]
+
+    status = MEMORYSTATUSEX()
+    status.dwLength = ctypes.sizeof(status)
+    try:
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return status
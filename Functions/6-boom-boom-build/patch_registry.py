@@ -0,0 +1,116 @@
+"""Registry of the dialogue patch files (*-mod.json) in RES_DIR, scanned and
+validated once per bbb run. Layout (as produced by the Exporter/Desheetifier):
+
+  RES_DIR/<bundle name>/<container path>-mod.json   DialogueDatabases with a
+                                                    container path
+  RES_DIR/<bundle name>/<m_Name>-mod.json           ... without one
+
+Files directly in RES_DIR (I2Languages-mod.json, strings-mod.json) are not
+dialogue patches and are ignored.
+"""
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+PATCH_SUFFIX = '-mod.json'
+DIALOGUE_PATCH_FORMAT = 'dialogue-patch'
+
+PRELOAD_THREADS = 8
+
+
+def _load_patch(path):
+    """(parsed patch, None) or (None, reason it can't be used)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            patch = json.load(f)
+    except Exception as e:
+        return None, f"failed to read dialogue patch {path}: {str(e)}"
+    if patch.get('format') != DIALOGUE_PATCH_FORMAT:
+        return None, f"{path} is in the old full-tree format, skipping (re-run Desheetifier)"
+    return patch, None
+
+
+def _scan_patches(root, rel_dir=''):
+    """(relative path without the suffix, path) of the non-empty patch files
+    below root."""
+    found = []
+    try:
+        entries = list(os.scandir(os.path.join(root, rel_dir) if rel_dir else root))
+    except OSError:
+        return found
+    for entry in entries:
+        rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        if entry.is_dir():
+            found.extend(_scan_patches(root, rel))
+        elif entry.name.endswith(PATCH_SUFFIX) and entry.stat().st_size > 0:
+            found.append((rel[:-len(PATCH_SUFFIX)], entry.path))
+    return found
+
+
+class DialoguePatchRegistry:
+    """
+    Dialogue patches of RES_DIR by bundle name and container path (or m_Name).
+    """
+
+    def __init__(self, res_dir):
+        self.res_dir = res_dir
+        self.paths = {}      # bundle name -> {container path or m_Name: patch file}
+        self.patches = {}    # patch file -> parsed patch
+        self.invalid = set()  # patch files that failed to load
+
+    def __getstate__(self):
+        # worker processes load the patches of their bundles themselves
+        return dict(self.__dict__, patches={})
+
+    def scan(self, log_fn=None):
+        """Walk RES_DIR once and register every non-empty patch file."""
+        log = log_fn if log_fn else lambda msg: None
+        self.paths = {}
+        try:
+            bundle_dirs = [entry for entry in os.scandir(self.res_dir) if entry.is_dir()]
+        except OSError as e:
+            log(f"Warning: failed to scan RES_DIR '{self.res_dir}': {str(e)}")
+            return
+        for entry in bundle_dirs:
+            patches = dict(_scan_patches(entry.path))
+            if patches:
+                self.paths[entry.name] = patches
+        log(f"Dialogue patch registry: {sum(len(p) for p in self.paths.values())} patch(es) "
+            f"for {len(self.paths)} bundle(s)")
+
+    def preload(self, log_fn=None, threads=PRELOAD_THREADS, keep=True):
+        """Read and validate all registered patches in a thread pool. Without
+        keep (the bundles are patched in worker processes) only the invalid
+        ones are remembered."""
+        log = log_fn if log_fn else lambda msg: None
+        files = [path for patches in self.paths.values() for path in patches.values()]
+        with ThreadPoolExecutor(max_workers=max(1, min(threads, len(files)))) as pool:
+            for path, (patch, error) in zip(files, pool.map(_load_patch, files)):
+                if error is not None:
+                    log(f"Warning: {error}")
+                    self.invalid.add(path)
+                elif keep:
+                    self.patches[path] = patch
+
+    def bundles(self):
+        """Names of the bundles with at least one patch."""
+        return set(self.paths)
+
+    def bundle_patches(self, bundle_name):
+        """{container path or m_Name: patch file} of a bundle."""
+        return self.paths.get(os.path.basename(bundle_name), {})
+
+    def lookup(self, bundle_name, key):
+        """(patch file, parsed patch) for a DialogueDatabase, (None, None)
+        without a patch. The parsed patch is None when it's invalid."""
+        path = self.bundle_patches(bundle_name).get(key.replace(os.sep, '/'))
+        if path is None:
+            return None, None
+        if path in self.invalid:
+            return path, None
+        if path in self.patches:
+            return path, self.patches[path]
+        # not preloaded (worker process): read for this one use, so a worker
+        # never holds more than the patch at hand
+        return path, _load_patch(path)[0]
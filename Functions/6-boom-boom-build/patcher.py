@@ -1,12 +1,31 @@
 import gc
 import io
 import os
+import mmap
 import json
+import time
+import hashlib
+import queue
 import shutil
+import threading
 import traceback
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import UnityPy
 from PIL import Image
 
+from catalog import BundleCatalog, file_hash, is_dialogue_db_type, is_tmp_type
+from addressables import AddressablesCatalog
+from asset_locator import find_monobehaviour, peek_monobehaviour_name, read_unity_version
+from string_index import StringIndex, strings_key
+from build_manifest import BuildManifest
+from bundle_writer import save_file
+from memstat import process_rss, available_memory
+from patch_registry import DialoguePatchRegistry
+from runlog import RecordCollector, make_record
+from texture_overrides import TextureOverrideIndex
+from texture_cache import EncodedTextureCache
 from tmp_override import (
     TMP_OVERRIDE_FORMAT,
     HierarchyResolver,
@@ -17,29 +36,211 @@ from tmp_override import (
 )
 
 
-def _load_env(file_path):
+def _map_file(file_path, prefetch=False):
+    """Read-only memory map of a file: its pages are only loaded when
+    touched, and can be dropped again by the OS under memory pressure.
+    With prefetch, the OS is asked to start reading it in already."""
+    with open(file_path, 'rb') as fh:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    if prefetch and hasattr(mmap, 'MADV_WILLNEED'):
+        mapped.madvise(mmap.MADV_WILLNEED)
+    return mapped
+
+
+def _load_env(file_path, input_maps=None):
     """Read file into memory and load with UnityPy.
 
     Passing bytes to UnityPy causes it to use EndianBinaryReader_Memoryview
     which holds no file handle.  This means the original file is free to be
     overwritten immediately after this call returns, even on Windows.
+
+    With input_maps (a dict) the file is memory-mapped instead of copied into
+    memory. The mapping is stored in input_maps by file path and has to be
+    closed once the environment is released (ResourcePatcher._close_input_map)
+    - while it is open the file can't be replaced on Windows.
     """
+    if input_maps is not None:
+        mapped = _map_file(file_path)
+        input_maps[file_path] = mapped
+        return UnityPy.load(memoryview(mapped))
     with open(file_path, 'rb') as fh:
         data = fh.read()
     return UnityPy.load(io.BytesIO(data))
 
 
-def detect_unity_version(game_data_dir):
-    """Detect the Unity version by reading resources.assets from the game data directory."""
-    try:
-        resources_path = os.path.join(game_data_dir, 'resources.assets')
-        env = UnityPy.load(resources_path)
-        for sf in env.files.values():
-            if hasattr(sf, 'unity_version') and sf.unity_version:
-                return sf.unity_version
-    except Exception:
-        pass
-    return None
+class _BundlePipeline:
+    """
+    Read/patch/write pipeline for the bundles of one serial stage: a prefetch
+    thread reads ahead and a writer thread saves finished bundles, each at
+    most `depth` deep. The wait times (read_wait, write_wait, writer_idle)
+    tell I/O- from CPU-bound runs.
+    """
+
+    _DONE = object()
+
+    def __init__(self, bundle_dir, bundle_names, depth, log, input_maps=None):
+        self.log = log
+        self.input_maps = input_maps  # see _load_env
+        self.stats = {'read_wait': 0.0, 'write_wait': 0.0, 'writer_idle': 0.0}
+        self._stop = threading.Event()
+        self._reads = queue.Queue(maxsize=depth)
+        self._writes = queue.Queue(maxsize=depth)
+        self._reader = threading.Thread(target=self._prefetch, daemon=True,
+                                        args=(bundle_dir, list(bundle_names)))
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._reader.start()
+        self._writer.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._reads.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _prefetch(self, bundle_dir, bundle_names):
+        for bundle_name in bundle_names:
+            if self._stop.is_set():
+                return
+            file_path = os.path.join(bundle_dir, bundle_name)
+            try:
+                if self.input_maps is not None:
+                    mapped = _map_file(file_path, prefetch=True)
+                    self.input_maps[file_path] = mapped
+                    item = (bundle_name, memoryview(mapped), None)
+                else:
+                    with open(file_path, 'rb') as fh:
+                        item = (bundle_name, fh.read(), None)
+            except Exception as e:
+                item = (bundle_name, None, e)
+            self._put(item)
+        self._put((None, None, None))
+
+    def load(self, bundle_name):
+        """Load a bundle - names must be requested in the order they were
+        given; read-ahead files of bundles that were never requested are
+        dropped (the same contract as _load_env otherwise)."""
+        started = time.perf_counter()
+        while True:
+            name, data, error = self._reads.get()
+            if name is None:
+                self.stats['read_wait'] += time.perf_counter() - started
+                raise RuntimeError(f"Bundle {bundle_name} was not read ahead by the pipeline")
+            if name == bundle_name:
+                break
+        self.stats['read_wait'] += time.perf_counter() - started
+        if error is not None:
+            raise error
+        if self.input_maps is not None:
+            return UnityPy.load(data)
+        return UnityPy.load(io.BytesIO(data))
+
+    def write(self, job):
+        """Queue a callable that saves and writes one bundle."""
+        started = time.perf_counter()
+        self._writes.put(job)
+        self.stats['write_wait'] += time.perf_counter() - started
+
+    def _write(self):
+        while True:
+            started = time.perf_counter()
+            job = self._writes.get()
+            self.stats['writer_idle'] += time.perf_counter() - started
+            if job is self._DONE:
+                return
+            job()
+            job = None  # holds the bundle - don't keep it until the next job
+
+    def close(self):
+        """Wait for all queued outputs to be written and stop the threads."""
+        self._writes.put(self._DONE)
+        self._writer.join()
+        self._stop.set()
+        while True:
+            try:
+                self._reads.get_nowait()
+            except queue.Empty:
+                break
+        self._reader.join()
+
+
+# Per-bundle counters, merged back from the worker processes in parallel mode
+COUNTERS = ('strings_num', 'textures_num', 'dialogues_num', 'bundles_num',
+            'fonts_num', 'tmp_overrides_num', 'textures_cached_num')
+
+# Part of every incremental build key - bump whenever the patching routines
+# change what they write, so outputs of older versions aren't reused
+PATCHER_VERSION = 1
+
+# Output bundle compression, passed to UnityPy as the packer: 'original'
+# recompresses like the game's bundles (LZMA/LZ4HC), 'lz4' is much quicker to
+# write, 'none' writes uncompressed bundles. The game loads all of them.
+COMPRESSION_PROFILES = ('original', 'lz4', 'none')
+
+# ResourcePatcher copy of a worker process (parallel mode)
+_worker = None
+_worker_tasks = 0
+
+
+def _init_worker(patcher):
+    """Process pool initializer: keep the patcher state sent by the main
+    process and apply its UnityPy configuration."""
+    global _worker
+    import warnings
+    warnings.filterwarnings("ignore", category=UnityPy.config.UnityVersionFallbackWarning)
+    UnityPy.config.FALLBACK_UNITY_VERSION = patcher.unity_version
+    if patcher.use_python_parser:
+        from UnityPy.helpers import TypeTreeHelper
+        TypeTreeHelper.read_typetree_boost = False
+    _worker = patcher
+
+
+def _run_worker_task(stage, method, args):
+    """Run one per-bundle method in a worker process. Returns the counters
+    it incremented, the log records it produced (see runlog.RecordCollector)
+    and whether the bundle failed."""
+    global _worker_tasks
+    collector = RecordCollector(stage=stage, bundle=args[0])
+    _worker.log = collector
+    for name in COUNTERS:
+        setattr(_worker, name, 0)
+    _worker._failed_bundles.clear()
+    getattr(_worker, method)(*args)
+    _worker._replace_pending_outputs(final=True)
+    _worker._close_input_maps()
+    _worker_tasks += 1
+    if _worker_tasks % 50 == 0:
+        gc.collect()
+    return ({name: getattr(_worker, name) for name in COUNTERS}, collector.records,
+            args[0] in _worker._failed_bundles)
+
+
+def _recycling_worker(patcher, worker_id, tasks, results, max_tasks, rss_limit):
+    """Worker process of the recycling mode: runs the jobs the parent sends
+    to its own task queue, one at a time, until it is told to stop, has run
+    max_tasks bundles or its RSS passed rss_limit after a bundle - the parent
+    then starts a fresh one."""
+    _init_worker(patcher)
+    done = 0
+    while True:
+        job = tasks.get()
+        if job is None:
+            return
+        job_id, stage, method, args = job
+        try:
+            result = _run_worker_task(stage, method, args)
+        except Exception:
+            result = ({name: 0 for name in COUNTERS},
+                      [make_record(f"Error processing bundle {args[0]}: {traceback.format_exc()}",
+                                   stage=stage, bundle=args[0])], True)
+        done += 1
+        rss = process_rss()
+        retire = bool((max_tasks and done >= max_tasks)
+                      or (rss_limit and rss is not None and rss > rss_limit))
+        results.put((worker_id, job_id, result, retire))
+        if retire:
+            return
 
 
 class ResourcePatcher:
@@ -57,7 +258,11 @@ class ResourcePatcher:
     def __init__(self, game_data_dir, res_dir, out_dir, overrides_dir=None,
                  unity_version=None, skip_textures=False, use_python_parser=False,
                  typetree_path=None, textures_list_path=None,
-                 log_fn=None, on_progress=None, clean_output=True):
+                 log_fn=None, on_progress=None, clean_output=True, catalog_path=None,
+                 locator_cache_path=None, string_index_path=None, workers=1,
+                 pipeline_depth=2, build_manifest_path=None, compression='original',
+                 mmap_input=False, recycle_after=0, worker_memory_limit=0,
+                 texture_cache_dir=None):
         """
         :param game_data_dir:      Path to 1000xRESIST_Data directory.
         :param res_dir:            Path to resources directory containing flat
@@ -74,10 +279,60 @@ class ResourcePatcher:
         :param use_python_parser:  If True, use UnityPy Python parser instead of C++ boost.
         :param typetree_path:      Path to I2.loc.typetree.json.
         :param textures_list_path: Path to textures.list file.
-        :param log_fn:             Optional callable(message: str) for logging.
+        :param log_fn:             Optional callable(message: str) for logging. A
+                                   runlog.RunLog also gets the stage and bundle of every
+                                   record, and worker records with their own timestamps.
         :param on_progress:        Optional callable(stage: str, current: int, total: int).
         :param clean_output:       If True, remove out_dir/1000xRESIST_Data before patching.
                                    Set to False when patching in-place into the game directory.
+        :param catalog_path:       Optional path to the persistent bundle catalog (see
+                                   catalog.py). When given, only bundles that can hold
+                                   patchable content are opened; without it every bundle
+                                   matching the name patterns is.
+        :param locator_cache_path: Optional path to the asset locator cache (see
+                                   asset_locator.py) remembering where I2Languages
+                                   sits in resources.assets.
+        :param string_index_path:  Optional path to the string index written by the
+                                   Exporter (see string_index.py). Used together with
+                                   catalog_path to read only the TMP objects that get
+                                   patched; bundles without a valid entry are scanned
+                                   as a whole.
+        :param workers:            Number of worker processes the bundles of the strings,
+                                   dialogues and textures stages are spread over. 1 (the
+                                   default) patches everything serially in this process.
+                                   None is 1 as well, except in worker recycling mode with
+                                   a worker_memory_limit: then as many workers as fit into
+                                   the available memory are used (at most one per core).
+        :param pipeline_depth:     Serial mode only: number of bundle files read ahead by
+                                   a prefetch thread and of patched bundles queued for a
+                                   background writer thread. 0 disables the pipeline.
+        :param build_manifest_path: Optional path to the build manifest (see
+                                   build_manifest.py). When given, the build is
+                                   incremental: bundles whose input and patch data are
+                                   unchanged keep their previous output, and instead of
+                                   cleaning the output directory only outputs that don't
+                                   belong to this run are removed.
+        :param compression:        Compression profile of the written bundles (see
+                                   COMPRESSION_PROFILES): 'original' for releases, 'lz4'
+                                   for playtest builds, 'none' for local testing.
+        :param mmap_input:         If True, input files are memory-mapped read-only
+                                   instead of read into memory, which lowers peak memory
+                                   use on large bundles. Outputs are always written to a
+                                   temp file next to the target and renamed over it.
+        :param recycle_after:      Worker recycling mode: bundles are patched in worker
+                                   processes (even with workers=1), and each worker is
+                                   replaced by a fresh one after this many bundles.
+                                   0 disables the limit.
+        :param worker_memory_limit: Worker recycling mode: RSS ceiling of a worker
+                                   process in MB, checked after every bundle - a worker
+                                   above it is replaced. The number of workers is also
+                                   capped to (or, with workers=None, chosen from) what
+                                   fits into the available memory.
+                                   0 disables the limit.
+        :param texture_cache_dir:  Optional directory of the encoded texture cache (see
+                                   texture_cache.py). When given, texture overrides are
+                                   encoded into the game's texture formats once and the
+                                   cached data is reused by later builds.
         """
         self.game_data_dir = game_data_dir
         self.res_dir = res_dir
@@ -85,16 +340,40 @@ class ResourcePatcher:
         self.clean_output = clean_output
         self.overrides_dir = overrides_dir
         self.skip_textures = skip_textures
+        self.locator_cache_path = locator_cache_path
+        self.mmap_input = mmap_input
+        # (temp file, target, input, bundle name) of outputs replacing
+        # memory-mapped inputs, see _write_output
+        self._pending_outputs = []
+        self._input_maps = {}  # see _load_env
         self.log = log_fn if log_fn else lambda msg: None
         self.on_progress = on_progress if on_progress else lambda stage, cur, tot: None
 
+        # resources.assets is loaded at most once and shared by version
+        # detection, I2Languages and fonts
+        self._resources_env = None
+
         # Configure UnityPy - auto-detect version from resources.assets if not provided
         if not unity_version:
-            unity_version = detect_unity_version(game_data_dir)
+            unity_version = self._detect_unity_version()
         if not unity_version or not unity_version.startswith('6000'):
             raise RuntimeError(f"This game version is not supported (detected: {unity_version})")
         UnityPy.config.FALLBACK_UNITY_VERSION = unity_version
+        self.unity_version = unity_version
+        self.use_python_parser = use_python_parser
+        self.auto_workers = workers is None
+        self.workers = 1 if workers is None else max(1, workers)
+        self.recycle_after = max(0, recycle_after)
+        self.worker_memory_limit = max(0, worker_memory_limit) * 1024 * 1024
+        self.pipeline_depth = max(0, pipeline_depth)
+        if compression not in COMPRESSION_PROFILES:
+            raise ValueError(f"Unknown compression profile '{compression}' "
+                             f"(expected one of {', '.join(COMPRESSION_PROFILES)})")
+        self.compression = compression
+        self.pipeline_stats = {}  # stage -> wait times of its pipeline
+        self._pipeline = None
         self.log(f"Unity version: {unity_version}")
+        self.log(f"Compression profile: {compression}")
 
         import warnings
         warnings.filterwarnings("ignore", category=UnityPy.config.UnityVersionFallbackWarning)
@@ -117,6 +396,26 @@ class ResourcePatcher:
                  f"{len(self.texture_bundles)} texture, {len(self.scene_bundles)} scene, "
                  f"{len(self.atlas_bundles)} sprite atlas")
 
+        # Narrow the name-based lists down to the bundles that can actually
+        # hold something to patch, using the (incrementally refreshed) catalog
+        self.catalog = None
+        if catalog_path:
+            self.catalog = BundleCatalog(self.bundle_dir, catalog_path, log_fn=self.log)
+            self.catalog.refresh(
+                on_progress=lambda cur, tot: self.on_progress('catalog', cur, tot))
+            self.dialogue_bundles = self.catalog.dialogue_bundles(self.dialogue_bundles)
+            self.texture_bundles  = self.catalog.texture_bundles(self.texture_bundles)
+            self.scene_bundles    = self.catalog.tmp_bundles(self.scene_bundles)
+            self.atlas_bundles    = self.catalog.texture_bundles(self.atlas_bundles)
+            self.log(f"Bundles to open: {len(self.dialogue_bundles)} dialogue, "
+                     f"{len(self.texture_bundles)} texture, {len(self.scene_bundles)} scene, "
+                     f"{len(self.atlas_bundles)} sprite atlas")
+
+        # The string index is only usable with bundle hashes to validate it
+        self.string_index = None
+        if string_index_path and self.catalog is not None:
+            self.string_index = StringIndex(string_index_path, log_fn=self.log)
+
         # Load typetree
         if typetree_path is None:
             raise ValueError("typetree_path must be provided")
@@ -138,10 +437,54 @@ class ResourcePatcher:
         self.bundles_num      = 0
         self.fonts_num        = 0
         self.tmp_overrides_num = 0
+        self.textures_cached_num = 0
+
+        self.bundles_reused    = 0
 
         # TMP overrides (loaded lazily on first use in _import_strings)
         self._tmp_overrides = None
 
+        # Dialogue patches (scanned and loaded at the start of _import_dialogues)
+        self.dialogue_patches = None
+
+        # Texture overrides (indexed and routed at the start of _import_textures)
+        self.texture_overrides = None
+        self.texture_cache = EncodedTextureCache(texture_cache_dir) if texture_cache_dir else None
+
+        # Stages collected for the process pool (parallel mode only)
+        self._parallel_stages = None
+
+        # Incremental builds; bundles whose patching or writing failed are
+        # never recorded in the manifest
+        self.build_manifest = None
+        if build_manifest_path:
+            self.build_manifest = BuildManifest(build_manifest_path, log_fn=self.log)
+        self._failed_bundles = set()
+
+    # Attributes that stay in the main process - everything else is sent to
+    # the worker processes of the parallel mode (see _init_worker)
+    _MAIN_PROCESS_ONLY = ('log', 'on_progress', 'catalog', 'string_index', '_resources_env',
+                          '_i2_patch', '_I2LocTypetree', '_parallel_stages', '_pipeline',
+                          'build_manifest', '_input_maps')
+
+    def __getstate__(self):
+        # _import_* instance attributes are stages disabled by monkey-patching
+        # (see the IMPORT_* debug flags in main.py) - not needed by workers
+        return {key: value for key, value in self.__dict__.items()
+                if key not in self._MAIN_PROCESS_ONLY and not key.startswith('_import_')}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.log = lambda msg: None
+        self.on_progress = lambda stage, cur, tot: None
+        self.catalog = None
+        self.string_index = None
+        self._resources_env = None
+        self._parallel_stages = None
+        self._pipeline = None
+        self.build_manifest = None
+        self._input_maps = {}
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -150,18 +493,449 @@ class ResourcePatcher:
         """Run the full patching pipeline. Returns a summary dict."""
         self._validate_resources()
         self._load_resources()
-        if self.clean_output:
+        if self.clean_output and self.build_manifest is None:
             self._clean_output()
         self._import_i2languages()
+        self._replace_pending_outputs(final=True)
+        if self.workers > 1 or self._recycle_workers():
+            # the stages only collect their bundles, which are then patched
+            # together by the process pool
+            self._parallel_stages = []
         self._import_strings()
         self._import_dialogues()
         self._import_textures()
+        if self._parallel_stages is not None:
+            stages, self._parallel_stages = self._parallel_stages, None
+            self._run_parallel(stages)
+        if self.build_manifest is not None:
+            if self.clean_output:
+                self._prune_output()
+            self.build_manifest.save()
         return self._summary()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _run_stage(self, stage, method, tasks, patch_slice=None):
+        """Run a per-bundle method over the argument tuples in tasks, reporting
+        progress - or, in parallel mode, hand them over to _run_parallel.
+        The first argument of every task is the bundle name.
+
+        patch_slice(bundle_name) returns the patch data that applies to a
+        bundle; in incremental builds it goes into the build keys, and
+        bundles with an unchanged key are not patched again."""
+        keys = None
+        if self.build_manifest is not None:
+            self.build_manifest.stage_ran(stage)
+        if self.build_manifest is not None and patch_slice is not None:
+            keys = {args[0]: self._build_key(stage, args[0], patch_slice(args[0]))
+                    for args in tasks}
+            tasks = self._reuse_outputs(stage, tasks, keys)
+        if self._parallel_stages is not None:
+            self._parallel_stages.append((stage, method, tasks, keys))
+            return
+        total = len(tasks)
+        if self.pipeline_depth > 0 and tasks:
+            self._pipeline = _BundlePipeline(self.bundle_dir, [args[0] for args in tasks],
+                                             self.pipeline_depth, self.log, self._maps())
+        patched = []  # (bundle name, counters), recorded once all writes are done
+        log = self.log
+        try:
+            for idx, args in enumerate(tasks):
+                self.on_progress(stage, idx, total)
+                before = self._counters()
+                if hasattr(log, 'write_records'):
+                    # a runlog.RunLog - tag the records with the bundle
+                    self.log = partial(log, stage=stage, bundle=args[0])
+                getattr(self, method)(*args)
+                self.log = log
+                patched.append((args[0], self._counters(before)))
+                self._replace_pending_outputs()
+                if idx % 50 == 0:
+                    gc.collect()
+        finally:
+            self.log = log
+            pipeline, self._pipeline = self._pipeline, None
+            if pipeline is not None:
+                pipeline.close()
+                self.pipeline_stats[stage] = pipeline.stats
+                self.log(f"Pipeline waits ({stage}): "
+                         f"{pipeline.stats['read_wait']:.1f}s on reads, "
+                         f"{pipeline.stats['write_wait']:.1f}s on the writer, "
+                         f"writer idle {pipeline.stats['writer_idle']:.1f}s")
+        self._replace_pending_outputs(final=True)
+        self._close_input_maps()
+        for bundle_name, counters in patched:
+            if bundle_name in self._failed_bundles:
+                # nothing of a failed bundle was written - don't count it
+                for name, value in counters.items():
+                    setattr(self, name, getattr(self, name) - value)
+            elif keys is not None:
+                self._record_build(bundle_name, stage, keys[bundle_name])
+        self.on_progress(stage, total, total)
+
+    def _counters(self, since=None):
+        """Current per-bundle counters (except bundles_num, which the writer
+        thread increments), or how much they grew since an earlier call."""
+        counters = {name: getattr(self, name) for name in COUNTERS if name != 'bundles_num'}
+        if since is not None:
+            counters = {name: value - since[name] for name, value in counters.items()}
+        return counters
+
+    def _build_key(self, stage, bundle_name, patch_slice):
+        """Incremental build key of a bundle: its input hash, the patch data
+        that applies to it and everything else that shapes the output."""
+        input_hash = self.catalog.bundle_hash(bundle_name) if self.catalog is not None else None
+        if input_hash is None:
+            input_hash = file_hash(os.path.join(self.bundle_dir, bundle_name))
+        payload = json.dumps([PATCHER_VERSION, self.unity_version, self.compression, stage,
+                              input_hash, patch_slice],
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _reuse_outputs(self, stage, tasks, keys):
+        """Drop the tasks of bundles whose previous output is still valid -
+        they only count as reused, none of their work is done in this run.
+        Returns the remaining tasks."""
+        remaining = []
+        for args in tasks:
+            bundle_name = args[0]
+            out_path = self._out_bundle_path(bundle_name)
+            entry = self.build_manifest.lookup(bundle_name, keys[bundle_name], out_path)
+            if entry is None:
+                # an output of an earlier build must not pass for this one's
+                if os.path.exists(out_path):
+                    os.remove(out_path)
+                remaining.append(args)
+                continue
+            self.bundles_reused += 1
+        self.log(f"Incremental build ({stage}): {len(tasks) - len(remaining)} unchanged "
+                 f"bundle(s) reused, {len(remaining)} to patch")
+        return remaining
+
+    def _record_build(self, bundle_name, stage, key):
+        if bundle_name in self._failed_bundles:
+            return
+        self.build_manifest.record(bundle_name, stage, key, self._out_bundle_path(bundle_name))
+
+    def _prune_output(self):
+        """Incremental builds: remove output bundles of earlier builds that
+        this run neither reused nor wrote."""
+        out_bundle_dir = os.path.join(self.out_dir, self.STREAMING_ASSETS_PATH)
+        if not os.path.isdir(out_bundle_dir):
+            return
+        keep = self.build_manifest.outputs()
+        for filename in os.listdir(out_bundle_dir):
+            if filename not in keep:
+                self.log(f"Removing stale output: {filename}")
+                os.remove(os.path.join(out_bundle_dir, filename))
+
+    def _out_bundle_path(self, bundle_name):
+        return os.path.join(self.out_dir, self.STREAMING_ASSETS_PATH, bundle_name)
+
+    def _load_bundle(self, bundle_name):
+        """Load a bundle of the running stage (prefetched when pipelined)."""
+        if self._pipeline is not None:
+            return self._pipeline.load(bundle_name)
+        return _load_env(os.path.join(self.bundle_dir, bundle_name), self._maps())
+
+    def _write_bundle(self, bundle_name, env, details):
+        """Save a patched bundle to the output directory - in the writer
+        thread when pipelined, right away otherwise."""
+        out_bundle_path = self._out_bundle_path(bundle_name)
+        log = self.log  # the writer thread runs while the next bundle is patched
+
+        def write():
+            try:
+                os.makedirs(os.path.dirname(out_bundle_path), exist_ok=True)
+                log(f"Writing file: {out_bundle_path} ({details})")
+                if self._write_output(out_bundle_path, env.file, self.compression,
+                                      os.path.join(self.bundle_dir, bundle_name), bundle_name):
+                    self.bundles_num += 1
+            except Exception as e:
+                self._failed_bundles.add(bundle_name)
+                log(f"Error writing bundle {bundle_name}: {str(e)}")
+                log(traceback.format_exc())
+
+        if self._pipeline is not None:
+            self._pipeline.write(write)
+        else:
+            write()
+
+    def _write_output(self, out_path, unity_file, packer, input_path, bundle_name=None):
+        """Save a loaded file (env.file) atomically: streamed into a temp file
+        next to the output (see bundle_writer.py), then renamed over it.
+        Returns False when the target is a memory-mapped input, which is
+        replaced later by _replace_pending_outputs."""
+        tmp_path = out_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                save_file(unity_file, f, packer)
+        except BaseException:
+            # never leave a stray .tmp behind (e.g. in the game's StreamingAssets)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if (self.mmap_input and os.path.exists(out_path)
+                and os.path.samefile(out_path, input_path)):
+            self._pending_outputs.append((tmp_path, out_path, input_path, bundle_name))
+            return False
+        os.replace(tmp_path, out_path)
+        return True
+
+    def _maps(self):
+        """input_maps argument of _load_env/_BundlePipeline."""
+        return self._input_maps if self.mmap_input else None
+
+    def _close_input_map(self, file_path):
+        """Close the memory map of an input once its environment is released.
+        UnityPy environments are reference cycles, so views of a map can
+        outlive the patching routine: a map still in use is retried after one
+        collection. Returns False if it really is still in use."""
+        mapped = self._input_maps.get(file_path)
+        if mapped is None:
+            return True
+        try:
+            mapped.close()
+        except BufferError:
+            gc.collect()
+            try:
+                mapped.close()
+            except BufferError:
+                return False
+        del self._input_maps[file_path]
+        return True
+
+    def _close_input_maps(self):
+        """Close the memory maps of all inputs that are no longer in use
+        (called at the end of a stage)."""
+        # a copy - the pipeline's prefetch thread adds maps while patching
+        for file_path in dict(self._input_maps):
+            self._close_input_map(file_path)
+
+    def _replace_pending_outputs(self, final=False):
+        """Rename the outputs deferred by _write_output over their inputs -
+        each as soon as its input map could be closed, so at most a few temp
+        files exist at a time. Outputs whose input is still in use are left
+        for a later call; on the final one they fail: the bundle is counted
+        as failed, and for resources.assets a RuntimeError is raised."""
+        # popped one by one - the writer thread appends while patching
+        for _ in range(len(self._pending_outputs)):
+            pending = self._pending_outputs.pop(0)
+            tmp_path, out_path, input_path, bundle_name = pending
+            try:
+                if not self._close_input_map(input_path):
+                    if not final:
+                        self._pending_outputs.append(pending)
+                        continue
+                    raise OSError(f"{input_path} is still in use")
+                os.replace(tmp_path, out_path)
+            except OSError as e:
+                os.remove(tmp_path)
+                msg = f"Error replacing {out_path}: {str(e)}"
+                self.log(msg)
+                if bundle_name is None:
+                    raise RuntimeError(msg) from e
+                self._failed_bundles.add(bundle_name)
+                continue
+            if bundle_name is not None:
+                self.bundles_num += 1
+
+    def _run_parallel(self, stages):
+        """Patch the bundles of all collected stages in a process pool,
+        largest file first. Progress is still reported stage by stage."""
+        order = [stage for stage, _, _, _ in stages]
+        totals = {stage: len(tasks) for stage, _, tasks, _ in stages}
+        keys = {stage: stage_keys for stage, _, _, stage_keys in stages}
+        done = {stage: 0 for stage in order}
+        jobs = [(stage, method, args) for stage, method, tasks, _ in stages for args in tasks]
+        jobs.sort(key=lambda job: os.path.getsize(os.path.join(self.bundle_dir, job[2][0])),
+                  reverse=True)
+        current = 0  # index in order of the stage progress is reported for
+
+        def report():
+            nonlocal current
+            while current < len(order):
+                stage = order[current]
+                self.on_progress(stage, done[stage], totals[stage])
+                if done[stage] < totals[stage]:
+                    return
+                current += 1
+
+        # stages without bundles (all skipped or reused) complete right away
+        report()
+        if not jobs:
+            return
+        if self._recycle_workers():
+            results = self._recycling_results(jobs)
+        else:
+            self.log(f"Patching {len(jobs)} bundle(s) with {self.workers} worker processes")
+            results = self._pool_results(jobs)
+
+        for job_id, (counters, records, failed) in results:
+            stage, _, args = jobs[job_id]
+            bundle_name = args[0]
+            self._write_records(records, stage=stage, bundle=bundle_name)
+            if failed:
+                # nothing of a failed bundle was written - don't count it
+                self._failed_bundles.add(bundle_name)
+            else:
+                for name, value in counters.items():
+                    setattr(self, name, getattr(self, name) + value)
+            if keys[stage] is not None and not failed:
+                self._record_build(bundle_name, stage, keys[stage][bundle_name])
+            done[stage] += 1
+            report()
+
+    def _write_records(self, records, **fields):
+        """Pass the records of a worker process on to the log - with their
+        own timestamps when log_fn is a runlog.RunLog, as messages otherwise."""
+        write_records = getattr(self.log, 'write_records', None)
+        if write_records is not None:
+            write_records(records, **fields)
+            return
+        for record in records:
+            self.log(record['message'])
+
+    def _pool_results(self, jobs):
+        """(job index, result) of jobs run in a process pool, as they complete.
+        Workers are spawned on every platform, so they only get what
+        __getstate__ sends them."""
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self,),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {pool.submit(_run_worker_task, stage, method, args): job_id
+                       for job_id, (stage, method, args) in enumerate(jobs)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _recycle_workers(self):
+        return bool(self.recycle_after or self.worker_memory_limit)
+
+    def _recycling_workers_count(self, jobs_count):
+        """Number of recycled workers: as many as their memory limit fits into
+        the available memory (a fifth of it is left to the main process and
+        the OS) - WORKERS caps it, or without WORKERS the number of cores."""
+        workers = self.workers
+        available = available_memory() if self.worker_memory_limit else None
+        if available is not None:
+            fit = max(1, int(available * 0.8) // self.worker_memory_limit)
+            if self.auto_workers:
+                workers = min(fit, os.cpu_count() or 1)
+                self.log(f"{available // (1024 * 1024)} MB of memory available - "
+                         f"room for {fit} worker process(es), using {workers}")
+            elif fit < workers:
+                self.log(f"Only {available // (1024 * 1024)} MB of memory available - "
+                         f"using {fit} instead of {workers} worker process(es)")
+                workers = fit
+        return max(1, min(workers, jobs_count))
+
+    def _recycling_results(self, jobs):
+        """(job index, result) of jobs run in short-lived worker processes (see
+        _recycling_worker), as they complete. Jobs are handed out one at a
+        time per worker, so the job of every worker is known here: a worker
+        that dies mid-bundle (e.g. killed for running out of memory) fails
+        that bundle only, once the results it did deliver have been read."""
+        workers_count = self._recycling_workers_count(len(jobs))
+        self.log(f"Patching {len(jobs)} bundle(s) with {workers_count} recycled worker "
+                 f"process(es) (new worker after {self.recycle_after or 'any number of'} "
+                 f"bundle(s), memory limit "
+                 f"{self.worker_memory_limit // (1024 * 1024) or 'none'} MB)")
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        pending = list(range(len(jobs)))[::-1]  # popped from the end, in order
+        workers = {}      # worker id -> [process, task queue, index of its job or None]
+        stopping = []     # processes told to stop (nothing left to hand out)
+        finished = set()  # indices of the jobs with a result
+        next_id = 0
+        recycled = 0
+
+        def dispatch(worker_id):
+            worker = workers[worker_id]
+            if not pending:
+                worker[1].put(None)
+                stopping.append(workers.pop(worker_id)[0])
+                return
+            job_id = pending.pop()
+            stage, method, args = jobs[job_id]
+            worker[2] = job_id
+            worker[1].put((job_id, stage, method, args))
+
+        def start_worker():
+            nonlocal next_id
+            tasks = ctx.Queue()
+            process = ctx.Process(target=_recycling_worker, daemon=True,
+                                  args=(self, next_id, tasks, results,
+                                        self.recycle_after, self.worker_memory_limit))
+            process.start()
+            workers[next_id] = [process, tasks, None]
+            dispatch(next_id)
+            next_id += 1
+
+        def handle(message):
+            nonlocal recycled
+            worker_id, job_id, result, retire = message
+            if worker_id in workers:
+                workers[worker_id][2] = None
+            if job_id not in finished:
+                finished.add(job_id)
+                yield job_id, result
+            if worker_id not in workers:
+                return
+            if retire:
+                workers.pop(worker_id)[0].join()
+                recycled += 1
+                if pending:
+                    start_worker()
+            else:
+                dispatch(worker_id)
+
+        try:
+            for _ in range(workers_count):
+                start_worker()
+            while len(finished) < len(jobs):
+                try:
+                    message = results.get(timeout=1.0)
+                except queue.Empty:
+                    message = None
+                if message is not None:
+                    yield from handle(message)
+                    continue
+                for worker_id in [w for w, (process, _, _) in workers.items()
+                                  if not process.is_alive()]:
+                    # a worker that exited (retiring, or killed right after
+                    # putting its result) may have delivered before - read
+                    # everything that's there before failing its job
+                    while True:
+                        try:
+                            message = results.get_nowait()
+                        except queue.Empty:
+                            break
+                        yield from handle(message)
+                    if worker_id not in workers:
+                        continue
+                    process, _, job_id = workers.pop(worker_id)
+                    if job_id is not None and job_id not in finished:
+                        finished.add(job_id)
+                        bundle_name = jobs[job_id][2][0]
+                        yield job_id, ({name: 0 for name in COUNTERS},
+                                       [make_record(f"Error processing bundle {bundle_name}: "
+                                                    f"worker process died (exit code "
+                                                    f"{process.exitcode}) - out of memory?")],
+                                       True)
+                    if pending:
+                        start_worker()
+        finally:
+            for process, tasks, _ in workers.values():
+                tasks.put(None)
+                stopping.append(process)
+            for process in stopping:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+        self.log(f"Recycled {recycled} worker process(es)")
+
     def _validate_resources(self):
         i2languages_path = os.path.join(self.res_dir, 'I2Languages-mod.json')
         if not os.path.exists(i2languages_path) or os.path.getsize(i2languages_path) == 0:
@@ -192,6 +966,25 @@ class ResourcePatcher:
         with open(strings_path, 'r', encoding='utf-8') as f:
             self._strings = json.load(f)
 
+    def _resources_assets(self):
+        """The loaded resources.assets environment (loaded on first use)."""
+        if self._resources_env is None:
+            file_path = os.path.join(self.game_data_dir, 'resources.assets')
+            self.log(f"Reading file: {file_path}")
+            self._resources_env = _load_env(file_path, self._maps())
+        return self._resources_env
+
+    def _detect_unity_version(self):
+        """Detect the Unity version from the resources.assets header, falling
+        back to fully loading the file (kept for the I2Languages stage)."""
+        unity_version = read_unity_version(os.path.join(self.game_data_dir, 'resources.assets'))
+        if unity_version:
+            return unity_version
+        try:
+            return self._resources_assets().file.unity_version or None
+        except Exception:
+            return None
+
     def _clean_output(self):
         if os.path.exists(self.out_dir):
             self.log(f"Cleaning output directory: {self.out_dir}")
@@ -200,44 +993,33 @@ class ResourcePatcher:
 
     def _import_i2languages(self):
         file_path = os.path.join(self.game_data_dir, 'resources.assets')
-        self.log(f"Reading file: {file_path}")
         self.on_progress('i2languages', 0, 1)
         try:
-            env = _load_env(file_path)
-            found = False
-            for obj in env.objects:
-                if obj.type.name == 'MonoBehaviour':
-                    try:
-                        data = obj.read(check_read=False)
-                        if getattr(data, 'm_Name') == "I2Languages":
-                            found = True
-                    except Exception:
-                        continue
-                    if found:
-                        # Merge translations into the ORIGINAL tree extracted from
-                        # the user's game - never replace the whole asset, so
-                        # content added/changed by newer game versions survives.
-                        tree = obj.read_typetree(self._I2LocTypetree['I2.Loc.LanguageSourceAsset'])
-                        applied = self._apply_i2_patch(tree)
-                        if applied:
-                            obj.save_typetree(tree,
-                                              self._I2LocTypetree['I2.Loc.LanguageSourceAsset'])
-                        # Replace legacy Font objects with override TTF/OTF files
-                        # (shares the same env / single save pass as I2Languages)
-                        self._import_fonts(env)
-                        os.makedirs(self.out_dir, exist_ok=True)
-                        out_path = os.path.join(self.out_dir, 'resources.assets')
-                        self.log(f"Writing file: {out_path}")
-                        with open(out_path, "wb") as f:
-                            f.write(env.file.save(packer="original"))
-                        self.on_progress('i2languages', 1, 1)
-                        self.log(f"I2Languages successfully patched ({applied} terms applied)")
-                        break
-
-            if not found:
+            env = self._resources_assets()
+            obj = find_monobehaviour(env.file, file_path, 'I2Languages',
+                                     self.locator_cache_path, self.log)
+            if obj is None:
                 msg = "Failed to import I2Languages: I2Languages not found in resources.assets"
                 self.log(msg)
                 raise RuntimeError(msg)
+
+            # Merge translations into the ORIGINAL tree extracted from
+            # the user's game - never replace the whole asset, so
+            # content added/changed by newer game versions survives.
+            tree = obj.read_typetree(self._I2LocTypetree['I2.Loc.LanguageSourceAsset'])
+            applied = self._apply_i2_patch(tree)
+            if applied:
+                obj.save_typetree(tree,
+                                  self._I2LocTypetree['I2.Loc.LanguageSourceAsset'])
+            # Replace legacy Font objects with override TTF/OTF files
+            # (shares the same env / single save pass as I2Languages)
+            self._import_fonts(env)
+            os.makedirs(self.out_dir, exist_ok=True)
+            out_path = os.path.join(self.out_dir, 'resources.assets')
+            self.log(f"Writing file: {out_path}")
+            self._write_output(out_path, env.file, 'original', file_path)
+            self.on_progress('i2languages', 1, 1)
+            self.log(f"I2Languages successfully patched ({applied} terms applied)")
         except RuntimeError:
             raise
         except Exception as e:
@@ -245,6 +1027,11 @@ class ResourcePatcher:
             self.log(msg)
             self.log(traceback.format_exc())
             raise RuntimeError(msg) from e
+        finally:
+            # nothing else needs resources.assets - don't keep it in memory
+            # through the bundle stages
+            env = None
+            self._resources_env = None
 
     # Legacy fallback language indices, used only when the target language
     # cannot be resolved against mLanguages of the user's game version.
@@ -305,11 +1092,30 @@ class ResourcePatcher:
         return applied
 
     @staticmethod
-    def _find_field(fields, field_type, title):
+    def _field_map(fields):
+        """(type, title) -> the first field with them, built in one pass for
+        several lookups on the same fields."""
+        index = {}
         for f in fields or []:
-            if f.get('type') == field_type and f.get('title') == title:
-                return f
-        return None
+            index.setdefault((f.get('type'), f.get('title')), f)
+        return index
+
+    @staticmethod
+    def _compile_dialogue_plan(dialogues_patch):
+        """Group the flat dialogue keys of a patch
+        ('<conversation title>/<entry id>/DialogueText|MenuText' -> text) by
+        conversation title and entry id, so conversations without patched
+        entries are skipped as a whole. Empty translations are dropped."""
+        plan = {}
+        for key, text in dialogues_patch.items():
+            if not text:
+                continue
+            parts = key.rsplit('/', 2)
+            if len(parts) != 3 or parts[2] not in ('DialogueText', 'MenuText'):
+                continue
+            conv_title, entry_id, kind = parts
+            plan.setdefault(conv_title, {}).setdefault(entry_id, {})[kind] = text
+        return plan
 
     def _apply_dialogue_patch(self, typetree, patch):
         """Apply a flat dialogue patch to the original database typetree in
@@ -320,17 +1126,17 @@ class ResourcePatcher:
         actors_patch = patch.get('actors', {})
         if actors_patch:
             for actor in typetree.get('actors', []):
-                fields = actor.get('fields', [])
-                name_field = self._find_field(fields, 0, 'Name')
+                fields = self._field_map(actor.get('fields', []))
+                name_field = fields.get((0, 'Name'))
                 if not name_field:
                     continue
                 translation = actors_patch.get(name_field.get('value'))
                 if not translation:
                     continue
-                display_field = self._find_field(fields, 4, f'Display Name {target_lang}')
+                display_field = fields.get((4, f'Display Name {target_lang}'))
                 if display_field is None:
                     # workaround for "Grace"
-                    display_field = self._find_field(fields, 0, f'Display Name {target_lang}')
+                    display_field = fields.get((0, f'Display Name {target_lang}'))
                 if display_field is not None:
                     display_field['value'] = translation
                     applied += 1
@@ -338,20 +1144,21 @@ class ResourcePatcher:
         items_patch = patch.get('items', {})
         if items_patch:
             for item in typetree.get('items', []):
-                fields = item.get('fields', [])
-                key_field = self._find_field(fields, 0, 'Name')
+                fields = self._field_map(item.get('fields', []))
+                key_field = fields.get((0, 'Name'))
                 if not key_field:
                     continue
                 translation = items_patch.get(key_field.get('value'))
                 if not translation:
                     continue
-                desc_field = self._find_field(fields, 4, f'Description {target_lang}')
+                desc_field = fields.get((4, f'Description {target_lang}'))
                 if desc_field is not None:
                     desc_field['value'] = translation
                     applied += 1
 
-        dialogues_patch = patch.get('dialogues', {})
-        if dialogues_patch:
+        plan = self._compile_dialogue_plan(patch.get('dialogues', {}))
+        if plan:
+            menu_title = f'Menu Text {target_lang}'
             for conversation in typetree.get('conversations', []):
                 title_field = None
                 for f in conversation.get('fields', []):
@@ -361,18 +1168,23 @@ class ResourcePatcher:
                 conv_title = title_field.get('value') if title_field else None
                 if not conv_title:
                     continue
+                entries_plan = plan.get(str(conv_title))
+                if not entries_plan:
+                    continue
                 for entry in conversation.get('dialogueEntries', []):
-                    base_key = f"{conv_title}/{entry.get('id')}"
-                    dialogue_text = dialogues_patch.get(f"{base_key}/DialogueText")
+                    texts = entries_plan.get(str(entry.get('id')))
+                    if not texts:
+                        continue
+                    fields = self._field_map(entry.get('fields', []))
+                    dialogue_text = texts.get('DialogueText')
                     if dialogue_text:
-                        field = self._find_field(entry.get('fields', []), 4, target_lang)
+                        field = fields.get((4, target_lang))
                         if field is not None:
                             field['value'] = dialogue_text
                             applied += 1
-                    menu_text = dialogues_patch.get(f"{base_key}/MenuText")
+                    menu_text = texts.get('MenuText')
                     if menu_text:
-                        field = self._find_field(entry.get('fields', []), 4,
-                                                 f'Menu Text {target_lang}')
+                        field = fields.get((4, menu_title))
                         if field is not None:
                             field['value'] = menu_text
                             applied += 1
@@ -431,194 +1243,239 @@ class ResourcePatcher:
         if self._tmp_overrides:
             self.log(f"Loaded {count} TMP override(s) from {tmp_dir}")
 
+    def _string_targets(self, bundle_name, keys):
+        """{(serialized file name, path_id)} of the TMP objects in a bundle that
+        can get patched according to the string index, None when the bundle
+        has to be scanned as a whole."""
+        if self.string_index is None:
+            return None
+        return self.string_index.objects_for(bundle_name, self.catalog.bundle_hash(bundle_name), keys)
+
     def _import_strings(self):
         self._load_tmp_overrides()
-        total = len(self.scene_bundles)
-        for idx, bundle_name in enumerate(self.scene_bundles):
-            self.on_progress('strings', idx, total)
-            needs_saving = False
-            file_path = os.path.join(self.bundle_dir, bundle_name)
-            self.log(f"Reading file: {file_path}")
-            env = None
-            try:
-                env = _load_env(file_path)
-                bundle_strings_count = 0
-                bundle_overrides_count = 0
-                resolver = None  # created lazily on first TMP in this bundle
-
-                for obj in env.objects:
-                    if obj.type.name == 'MonoBehaviour':
-                        if not obj.serialized_type.nodes:
-                            continue
+        # strings.json keys that can change an object: translated strings and
+        # the strings TMP overrides are filed under
+        patch_keys = {key for key, value in self._strings.items() if value != ""}
+        patch_keys.update(strings_key(text) for text in self._tmp_overrides)
+        # skip bundles none of whose TMP texts is translated or overridden
+        # (the catalog keeps the TMP texts of every bundle)
+        bundles = self.scene_bundles
+        if self.catalog is not None:
+            bundles = self.catalog.bundles_with_tmp_texts(bundles, patch_keys)
+            self.log(f"Scene bundles to open: {len(bundles)} of {len(self.scene_bundles)} "
+                     f"(the rest hold no translated or overridden string)")
+        self._run_stage('strings', '_patch_scene_bundle',
+                        [(bundle_name, self._string_targets(bundle_name, patch_keys))
+                         for bundle_name in bundles],
+                        lambda bundle_name: self._strings_slice(bundle_name, patch_keys))
+
+    def _strings_slice(self, bundle_name, patch_keys):
+        """Translations and TMP overrides that can apply to a scene bundle -
+        those of its TMP texts when the catalog knows them, all otherwise."""
+        info = self.catalog.info(bundle_name) if self.catalog is not None else None
+        keys = patch_keys if info is None else patch_keys.intersection(info['tmp_texts'])
+        overrides = {}
+        for text, entries in self._tmp_overrides.items():
+            if strings_key(text) in keys:
+                overrides[strings_key(text)] = [[filename, payload] for filename, payload in entries]
+        return {'strings': {key: self._strings.get(key) for key in keys},
+                'tmp_overrides': overrides}
+
+    def _patch_scene_bundle(self, bundle_name, targets):
+        """Patch the TMP objects of one scene bundle (all of them, or only
+        targets when the string index knows where the patched strings are)."""
+        needs_saving = False
+        file_path = os.path.join(self.bundle_dir, bundle_name)
+        self.log(f"Reading file: {file_path}")
+        try:
+            env = self._load_bundle(bundle_name)
+            bundle_strings_count = 0
+            bundle_overrides_count = 0
+            resolver = None  # created lazily on first TMP in this bundle
+
+            objects = env.objects
+            if targets is not None:
+                objects = [obj for obj in objects
+                           if (obj.assets_file.name, obj.path_id) in targets]
+                self.log(f"String index: {len(objects)} TMP object(s) to patch in {bundle_name}")
+
+            for obj in objects:
+                if obj.type.name == 'MonoBehaviour':
+                    # only TMP-shaped types are deserialized at all
+                    if not is_tmp_type(obj):
+                        continue
+                    try:
+                        tree = obj.read_typetree()
+                    except Exception as inner_e:
+                        self.log(f"Error processing object in {bundle_name}: {str(inner_e)}")
+                        continue
+                    if is_tmp_tree(tree):
+                        # one failing object must not abort the whole
+                        # bundle (the bundle is written once at the end) -
+                        # patch best-effort, per object
                         try:
-                            tree = obj.read_typetree()
+                            changed = False
+                            transform_save = None  # (obj, tree), saved below
+                            # TMP overrides first: score every override filed
+                            # under the same string against this object, apply
+                            # the best-scoring one that reaches its threshold -
+                            # patch the MonoBehaviour (keeping the target's own
+                            # pointers) and the local transform of its
+                            # GameObject; the regular string replacement below
+                            # then still runs on the resulting tree
+                            candidates = self._tmp_overrides.get(tree['m_text'])
+                            if candidates:
+                                if resolver is None:
+                                    resolver = HierarchyResolver(env)
+                                anchor = resolver.resolve(tree)
+                                if anchor is not None:
+                                    best = None  # (score, filename, payload)
+                                    for filename, payload in candidates:
+                                        score = tmp_similarity(
+                                            tree, anchor['transform'],
+                                            payload['match']['tree'],
+                                            payload['match']['transform'])
+                                        if (score + 1e-12 >= payload['min_similarity']
+                                                and (best is None or score > best[0])):
+                                            best = (score, filename, payload)
+                                    if best is not None:
+                                        score, filename, payload = best
+                                        merged_tree = merge_tmp_override(
+                                            tree, payload['patch']['tree'])
+                                        new_tr = merge_transform_override(
+                                            anchor['transform_tree'],
+                                            payload['patch']['transform'])
+                                        # an override whose patch block still
+                                        # equals the original match block is
+                                        # a no-op - don't count or save it
+                                        if merged_tree != tree or new_tr != anchor['transform_tree']:
+                                            self.log(f"TMP override '{filename}' applied "
+                                                     f"(score {score:.4f}) to an object "
+                                                     f"in {bundle_name}")
+                                            tree = merged_tree
+                                            if new_tr != anchor['transform_tree']:
+                                                transform_save = (anchor['transform_obj'], new_tr)
+                                            changed = True
+                                            self.tmp_overrides_num += 1
+                                            bundle_overrides_count += 1
+                            key = strings_key(tree['m_text'])
+                            if key in self._strings and self._strings[key] != "":
+                                tree['m_text'] = self._strings[key].replace('\\t', '\t').replace('\\n', '\n')
+                                changed = True
+                                self.strings_num += 1
+                                bundle_strings_count += 1
+                            if changed:
+                                # MonoBehaviour first, then the transform -
+                                # a modified transform must never be saved
+                                # without the TMP it belongs to
+                                obj.save_typetree(tree)
+                                if transform_save is not None:
+                                    transform_save[0].save_typetree(transform_save[1])
+                                needs_saving = True
                         except Exception as inner_e:
-                            self.log(f"Error processing object in {bundle_name}: {str(inner_e)}")
+                            self.log(f"Error patching TMP object in {bundle_name}: {str(inner_e)}")
                             continue
-                        if is_tmp_tree(tree):
-                            # one failing object must not abort the whole
-                            # bundle (the bundle is written once at the end) -
-                            # patch best-effort, per object
-                            try:
-                                changed = False
-                                transform_save = None  # (obj, tree), saved below
-                                # TMP overrides first: score every override filed
-                                # under the same string against this object, apply
-                                # the best-scoring one that reaches its threshold -
-                                # patch the MonoBehaviour (keeping the target's own
-                                # pointers) and the local transform of its
-                                # GameObject; the regular string replacement below
-                                # then still runs on the resulting tree
-                                candidates = self._tmp_overrides.get(tree['m_text'])
-                                if candidates:
-                                    if resolver is None:
-                                        resolver = HierarchyResolver(env)
-                                    anchor = resolver.resolve(tree)
-                                    if anchor is not None:
-                                        best = None  # (score, filename, payload)
-                                        for filename, payload in candidates:
-                                            score = tmp_similarity(
-                                                tree, anchor['transform'],
-                                                payload['match']['tree'],
-                                                payload['match']['transform'])
-                                            if (score + 1e-12 >= payload['min_similarity']
-                                                    and (best is None or score > best[0])):
-                                                best = (score, filename, payload)
-                                        if best is not None:
-                                            score, filename, payload = best
-                                            merged_tree = merge_tmp_override(
-                                                tree, payload['patch']['tree'])
-                                            new_tr = merge_transform_override(
-                                                anchor['transform_tree'],
-                                                payload['patch']['transform'])
-                                            # an override whose patch block still
-                                            # equals the original match block is
-                                            # a no-op - don't count or save it
-                                            if merged_tree != tree or new_tr != anchor['transform_tree']:
-                                                self.log(f"TMP override '{filename}' applied "
-                                                         f"(score {score:.4f}) to an object "
-                                                         f"in {bundle_name}")
-                                                tree = merged_tree
-                                                if new_tr != anchor['transform_tree']:
-                                                    transform_save = (anchor['transform_obj'], new_tr)
-                                                changed = True
-                                                self.tmp_overrides_num += 1
-                                                bundle_overrides_count += 1
-                                strings_key = tree['m_text'].replace('\t', '\\t').replace('\n', '\\n')
-                                if strings_key in self._strings and self._strings[strings_key] != "":
-                                    tree['m_text'] = self._strings[strings_key].replace('\\t', '\t').replace('\\n', '\n')
-                                    changed = True
-                                    self.strings_num += 1
-                                    bundle_strings_count += 1
-                                if changed:
-                                    # MonoBehaviour first, then the transform -
-                                    # a modified transform must never be saved
-                                    # without the TMP it belongs to
-                                    obj.save_typetree(tree)
-                                    if transform_save is not None:
-                                        transform_save[0].save_typetree(transform_save[1])
-                                    needs_saving = True
-                            except Exception as inner_e:
-                                self.log(f"Error patching TMP object in {bundle_name}: {str(inner_e)}")
-                                continue
-
-                if needs_saving:
-                    out_bundle_path = os.path.join(self.out_dir, self.STREAMING_ASSETS_PATH, bundle_name)
-                    os.makedirs(os.path.dirname(out_bundle_path), exist_ok=True)
-                    self.log(f"Writing file: {out_bundle_path} (imported {bundle_strings_count} strings, applied {bundle_overrides_count} TMP overrides)")
-                    with open(out_bundle_path, "wb") as f:
-                        f.write(env.file.save(packer="original"))
-                    self.bundles_num += 1
-            except Exception as e:
-                self.log(f"Error processing bundle {bundle_name}: {str(e)}")
-                self.log(traceback.format_exc())
-            finally:
-                env = None
-                if idx % 50 == 0:
-                    gc.collect()
-        self.on_progress('strings', total, total)
+
+            if needs_saving:
+                self._write_bundle(bundle_name, env, f"imported {bundle_strings_count} strings, applied {bundle_overrides_count} TMP overrides")
+        except Exception as e:
+            self._failed_bundles.add(bundle_name)
+            self.log(f"Error processing bundle {bundle_name}: {str(e)}")
+            self.log(traceback.format_exc())
 
     def _import_dialogues(self):
-        total = len(self.dialogue_bundles)
-        for idx, bundle_name in enumerate(self.dialogue_bundles):
-            self.on_progress('dialogues', idx, total)
-            needs_saving = False
-            file_path = os.path.join(self.bundle_dir, bundle_name)
-            self.log(f"Reading file: {file_path}")
-            env = None
-            try:
-                env = _load_env(file_path)
-                bundle_dialogues_count = 0
+        # every patch is found and parsed before the first bundle is opened
+        self.dialogue_patches = DialoguePatchRegistry(self.res_dir)
+        self.dialogue_patches.scan(self.log)
+        # pool workers load the patches of their own bundles
+        self.dialogue_patches.preload(self.log, keep=self._parallel_stages is None)
+        known = {os.path.basename(bundle_name) for bundle_name in self.dialogue_bundles}
+        for bundle_name in sorted(self.dialogue_patches.bundles() - known):
+            for path in self.dialogue_patches.bundle_patches(bundle_name).values():
+                self.log(f"Warning: orphan dialogue patch {path} - {bundle_name} is not "
+                         f"a game bundle with DialogueDatabases")
+        # bundles without a single patch file have nothing to merge - they
+        # are skipped without being loaded
+        patched = self.dialogue_patches.bundles()
+        bundles = [bundle_name for bundle_name in self.dialogue_bundles
+                   if os.path.basename(bundle_name) in patched]
+        self.log(f"Dialogue bundles to open: {len(bundles)} of {len(self.dialogue_bundles)} "
+                 f"({len(self.dialogue_bundles) - len(bundles)} skipped, no -mod.json patches)")
+        self._run_stage('dialogues', '_patch_dialogue_bundle',
+                        [(bundle_name,) for bundle_name in bundles],
+                        self._dialogues_slice)
+
+    def _dialogues_slice(self, bundle_name):
+        """Content hashes of the dialogue -mod.json patches of a bundle."""
+        return {key: file_hash(path)
+                for key, path in self.dialogue_patches.bundle_patches(bundle_name).items()}
+
+    def _patch_dialogue_bundle(self, bundle_name):
+        """Merge the dialogue patches into the DialogueDatabases of one bundle."""
+        needs_saving = False
+        file_path = os.path.join(self.bundle_dir, bundle_name)
+        self.log(f"Reading file: {file_path}")
+        try:
+            env = self._load_bundle(bundle_name)
+            bundle_dialogues_count = 0
 
-                pathid_to_asset = {}
-                for asset_path, obj in env.container.items():
-                    pathid_to_asset[obj.path_id] = asset_path
+            pathid_to_asset = {}
+            for asset_path, obj in env.container.items():
+                pathid_to_asset[obj.path_id] = asset_path
+            matched = set()  # registry keys of the patches found a database for
 
-                for obj in env.objects:
-                    if obj.type.name != 'MonoBehaviour':
-                        continue
-                    if not obj.serialized_type.nodes:
+            for obj in env.objects:
+                # pre-filter on the type node, the container path and the
+                # patch registry - only databases that get patched are
+                # deserialized (archived ones are large)
+                if obj.type.name != 'MonoBehaviour' or not is_dialogue_db_type(obj):
+                    continue
+
+                asset_path = pathid_to_asset.get(obj.path_id, '')
+                if 'DialogueDatabaseArchive' in asset_path:
+                    continue
+
+                key = asset_path or peek_monobehaviour_name(obj) or f'dialogue_{obj.path_id}'
+                mod_path, patch = self.dialogue_patches.lookup(bundle_name, key)
+
+                if mod_path is not None:
+                    matched.add(key)
+                    self.log(f"Found dialogue patch: {mod_path} for {asset_path or '(no container path)'}")
+                    if patch is None:
+                        # unreadable or old format - warned about on loading
                         continue
+
                     try:
                         typetree = obj.read_typetree()
                     except Exception as e:
                         self.log(f"Warning: failed to read typetree in {bundle_name}: {str(e)}")
                         continue
-
                     if not ('conversations' in typetree and 'actors' in typetree and 'items' in typetree):
                         continue
 
-                    asset_path = pathid_to_asset.get(obj.path_id, '')
-                    if 'DialogueDatabaseArchive' in asset_path:
-                        continue
-
-                    bundle_dest = os.path.join(self.res_dir, os.path.basename(bundle_name))
-                    if asset_path:
-                        asset_dir = os.path.join(bundle_dest, os.path.dirname(asset_path))
-                        filename = os.path.basename(asset_path) + "-mod.json"
-                    else:
-                        m_name = typetree.get('m_Name', f'dialogue_{obj.path_id}')
-                        asset_dir = bundle_dest
-                        filename = m_name + "-mod.json"
-                    mod_path = os.path.join(asset_dir, filename)
-
-                    if os.path.exists(mod_path) and os.path.getsize(mod_path) > 0:
-                        self.log(f"Found dialogue patch: {mod_path} for {asset_path or '(no container path)'}")
-                        with open(mod_path, 'r', encoding='utf-8') as f:
-                            patch = json.load(f)
-
-                        if patch.get('format') != 'dialogue-patch':
-                            self.log(f"Warning: {mod_path} is in the old full-tree "
-                                     "format, skipping (re-run Desheetifier)")
-                            continue
-
-                        # Merge translations into the ORIGINAL typetree read from
-                        # the user's bundle - never replace the whole database.
-                        applied = self._apply_dialogue_patch(typetree, patch)
-                        if applied:
-                            obj.save_typetree(typetree)
-                            needs_saving = True
-                            self.dialogues_num += 1
-                            bundle_dialogues_count += 1
-                            self.log(f"Applied {applied} translation(s) from {mod_path}")
-
-                if needs_saving:
-                    out_bundle_path = os.path.join(self.out_dir, self.STREAMING_ASSETS_PATH, bundle_name)
-                    os.makedirs(os.path.dirname(out_bundle_path), exist_ok=True)
-                    self.log(f"Writing file: {out_bundle_path} (imported {bundle_dialogues_count} dialogue databases)")
-                    with open(out_bundle_path, "wb") as f:
-                        f.write(env.file.save(packer="original"))
-                    self.bundles_num += 1
-            except Exception as e:
-                self.log(f"Error processing dialogue bundle {bundle_name}: {str(e)}")
-                self.log(traceback.format_exc())
-            finally:
-                env = None
-                if idx % 50 == 0:
-                    gc.collect()
-        self.on_progress('dialogues', total, total)
+                    # Merge translations into the ORIGINAL typetree read from
+                    # the user's bundle - never replace the whole database.
+                    applied = self._apply_dialogue_patch(typetree, patch)
+                    if applied:
+                        obj.save_typetree(typetree)
+                        needs_saving = True
+                        self.dialogues_num += 1
+                        bundle_dialogues_count += 1
+                        self.log(f"Applied {applied} translation(s) from {mod_path}")
+
+            for key, path in self.dialogue_patches.bundle_patches(bundle_name).items():
+                if key not in matched:
+                    self.log(f"Warning: orphan dialogue patch {path} - no DialogueDatabase "
+                             f"'{key}' in {bundle_name}")
+
+            if needs_saving:
+                self._write_bundle(bundle_name, env, f"imported {bundle_dialogues_count} dialogue databases")
+        except Exception as e:
+            self._failed_bundles.add(bundle_name)
+            self.log(f"Error processing dialogue bundle {bundle_name}: {str(e)}")
+            self.log(traceback.format_exc())
 
-    def _import_sprite_atlas(self, env, obj, asset_path):
+    def _import_sprite_atlas(self, env, obj, asset_path, override):
         """Replace the packed texture of a SpriteAtlas with an override PNG.
         Returns 1 if an override was applied, 0 otherwise.
 
@@ -628,10 +1485,6 @@ class ResourcePatcher:
                                            (sprite rects are fixed)
         """
         atlas_name = os.path.basename(asset_path).replace('.spriteatlas', '')
-        override = os.path.join(self.overrides_dir, atlas_name + '.png')
-        if not os.path.isfile(override):
-            return 0
-
         data = obj.read()
         pathid_to_obj = {o.path_id: o for o in env.objects}
 
@@ -651,7 +1504,7 @@ class ResourcePatcher:
                      f"whole-atlas override applies to page 0 only")
 
         tex_data = pathid_to_obj[page_pids[0]].read()
-        img = Image.open(override)
+        img = Image.open(override)  # lazy - only the header is read here
         if img.size != (tex_data.m_Width, tex_data.m_Height):
             self.log(f"Warning: atlas override {override} has wrong dimensions "
                      f"{img.size}, expected {(tex_data.m_Width, tex_data.m_Height)} "
@@ -659,69 +1512,100 @@ class ResourcePatcher:
             return 0
 
         self.log(f"Found atlas override: {override} for {asset_path}")
-        tex_data.image = img
-        tex_data.save()
+        self._set_texture_image(tex_data, override, img)
         return 1
 
+    def _set_texture_image(self, tex_data, override, img):
+        """tex_data.image = img; tex_data.save() - with the encoded texture
+        cache, an override already encoded into this texture's format is
+        injected without encoding it again."""
+        if self.texture_cache is None:
+            tex_data.image = img
+            tex_data.save()
+            return
+        # one mip level, like Texture2D.image does
+        key = self.texture_cache.key(self.texture_overrides.content_hash(override),
+                                     tex_data, img.size, 1)
+        cached = self.texture_cache.lookup(key)
+        if cached is not None:
+            self.texture_cache.apply(tex_data, *cached)
+            self.textures_cached_num += 1
+        else:
+            tex_data.image = img
+            try:
+                self.texture_cache.store(key, tex_data, 1)
+            except OSError as e:
+                self.log(f"Warning: failed to cache encoded texture {override}: {str(e)}")
+        tex_data.save()
+
     def _import_textures(self):
         if self.skip_textures:
             return
         if not self.overrides_dir:
+            # nothing to import - outputs of earlier texture builds are stale
+            if self.build_manifest is not None:
+                self.build_manifest.stage_ran('textures')
             return
 
-        total = len(self.texture_bundles) + len(self.atlas_bundles)
-        textures_set = set(self.textures)
-        for idx, bundle_name in enumerate(self.texture_bundles + self.atlas_bundles):
-            self.on_progress('textures', idx, total)
-            needs_saving = False
-            file_path = os.path.join(self.bundle_dir, bundle_name)
-            self.log(f"Reading file: {file_path}")
-            env = None
-            try:
-                env = _load_env(file_path)
-                bundle_textures_count = 0
-
-                for asset_path, obj in env.container.items():
-                    if asset_path not in textures_set:
-                        continue
-                    if obj.type.name in ['Texture2D', 'Sprite']:
-                        data = obj.read()
-                        check_path = asset_path
-                        if not check_path.endswith('.png'):
-                            check_path += '.png'
-                        override = os.path.join(self.overrides_dir, os.path.basename(check_path))
-                        if os.path.exists(override):
-                            self.log(f"Found texture override: {override} for {asset_path}")
-                            img = Image.open(override)
-                            if obj.type.name == 'Sprite':
-                                data = data.m_RD.texture.read()
-                            data.image = img
-                            data.save()
-                            needs_saving = True
-                            self.textures_num += 1
-                            bundle_textures_count += 1
-                    elif obj.type.name == 'SpriteAtlas':
-                        applied = self._import_sprite_atlas(env, obj, asset_path)
-                        if applied:
-                            needs_saving = True
-                            self.textures_num += applied
-                            bundle_textures_count += applied
-
-                if needs_saving:
-                    out_bundle_path = os.path.join(self.out_dir, self.STREAMING_ASSETS_PATH, bundle_name)
-                    os.makedirs(os.path.dirname(out_bundle_path), exist_ok=True)
-                    self.log(f"Writing file: {out_bundle_path} (imported {bundle_textures_count} textures)")
-                    with open(out_bundle_path, "wb") as f:
-                        f.write(env.file.save(packer="original"))
-                    self.bundles_num += 1
-            except Exception as e:
-                self.log(f"Error processing texture bundle {bundle_name}: {str(e)}")
-                self.log(traceback.format_exc())
-            finally:
-                env = None
-                if idx % 50 == 0:
-                    gc.collect()
-        self.on_progress('textures', total, total)
+        # Index the override PNGs of the listed textures and route them to
+        # the bundles holding those textures - bundles without a single
+        # override are never opened
+        self.texture_overrides = TextureOverrideIndex(self.overrides_dir)
+        self.texture_overrides.scan(self.textures, self.log)
+        candidates = self.texture_bundles + self.atlas_bundles
+        bundles = []
+        if self.texture_overrides.overrides:
+            addressables = AddressablesCatalog.find(self.game_data_dir, log_fn=self.log)
+            bundles = self.texture_overrides.route(candidates, addressables, self.catalog)
+        self.log(f"Texture bundles to open: {len(bundles)} of {len(candidates)}")
+
+        self._run_stage('textures', '_patch_texture_bundle',
+                        [(bundle_name,) for bundle_name in bundles],
+                        self._textures_slice)
+
+    def _textures_slice(self, bundle_name):
+        """Content hashes of the override PNGs routed to a texture bundle."""
+        return {asset_path: self.texture_overrides.content_hash(path)
+                for asset_path, path in self.texture_overrides.bundle_overrides(bundle_name).items()}
+
+    def _patch_texture_bundle(self, bundle_name):
+        """Apply texture, sprite and sprite atlas overrides to one bundle."""
+        needs_saving = False
+        file_path = os.path.join(self.bundle_dir, bundle_name)
+        self.log(f"Reading file: {file_path}")
+        try:
+            env = self._load_bundle(bundle_name)
+            bundle_textures_count = 0
+            overrides = self.texture_overrides.bundle_overrides(bundle_name)
+
+            for asset_path, obj in env.container.items():
+                # only the objects being replaced are read
+                override = overrides.get(asset_path)
+                if override is None:
+                    continue
+                if obj.type.name in ['Texture2D', 'Sprite']:
+                    self.log(f"Found texture override: {override} for {asset_path}")
+                    data = obj.read()
+                    img = Image.open(override)
+                    if obj.type.name == 'Sprite':
+                        data = data.m_RD.texture.read()
+                    self._set_texture_image(data, override, img)
+                    needs_saving = True
+                    self.textures_num += 1
+                    bundle_textures_count += 1
+                elif obj.type.name == 'SpriteAtlas':
+                    applied = self._import_sprite_atlas(env, obj, asset_path, override)
+                    if applied:
+                        needs_saving = True
+                        self.textures_num += applied
+                        bundle_textures_count += applied
+
+            if needs_saving:
+                self._write_bundle(bundle_name, env, f"imported {bundle_textures_count} textures")
+        except Exception as e:
+            self._failed_bundles.add(bundle_name)
+            self.log(f"Error processing texture bundle {bundle_name}: {str(e)}")
+            self.log(traceback.format_exc())
 
     def _import_fonts(self, env):
         """Replace m_FontData in legacy Font objects using override TTF/OTF files.
@@ -777,8 +1661,12 @@ class ResourcePatcher:
             'i2languages':   1,
             'strings':       self.strings_num,
             'textures':      self.textures_num,
+            'textures_cached': self.textures_cached_num,
             'dialogues':     self.dialogues_num,
             'bundles':       self.bundles_num,
             'fonts':         self.fonts_num,
             'tmp_overrides': self.tmp_overrides_num,
+            'reused':        self.bundles_reused,
+            'compression':   self.compression,
+            'failed':        sorted(self._failed_bundles),
         }
@@ -0,0 +1,183 @@
+"""Buffered run log shared by the Exporter and Boom Boom Build.
+
+Drop-in for their log(message) helpers and the log_fn of ResourcePatcher: a
+background thread writes the queued records to Logs/*.log (and optionally a
+.jsonl file) in batches. Worker processes log into a RecordCollector, the
+parent writes their records with write_records().
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+FLUSH_INTERVAL = 0.5
+
+
+def infer_level(message):
+    """Level of a message that was logged without one."""
+    head = message.lstrip()[:7].lower()
+    if head.startswith('error'):
+        return 'error'
+    if head.startswith('warning'):
+        return 'warning'
+    return 'info'
+
+
+def make_record(message, level=None, **fields):
+    message = str(message)
+    record = {'time': time.time(), 'level': level or infer_level(message), 'message': message}
+    record.update(fields)
+    return record
+
+
+class RecordCollector:
+    """log_fn for worker processes: keeps the records for the parent."""
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.records = []
+
+    def __call__(self, message, level=None, **fields):
+        self.records.append(make_record(message, level, **{**self.fields, **fields}))
+
+
+class RunLog:
+    """
+    Callable log with a buffered background writer.
+
+    The text log keeps the "[YYYY-mm-dd HH:MM:SS] message" line format.
+    Call close() (also registered with atexit) to flush everything.
+    """
+
+    def __init__(self, path, level='info', json_path=None, truncate=True):
+        """
+        :param path:      Text log file.
+        :param level:     Minimum level written (see LEVELS).
+        :param json_path: Optional JSON-lines file receiving the same records.
+        :param truncate:  If True, existing log files are emptied first.
+        """
+        self.path = path
+        self.json_path = None
+        self.min_level = LEVELS['info']
+        self.started = time.time()
+        self._context = {}
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._queue_lock = threading.Lock()  # no record is queued after close()
+        self._closed = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'w' if truncate else 'a', encoding='utf-8')
+        self._json_file = None
+        self._truncate = truncate
+        self.configure(level, json_path)
+
+        self._thread = threading.Thread(target=self._writer, name='runlog-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def configure(self, level=None, json_path=None):
+        """Change the minimum level and/or start writing JSON lines (for
+        settings only known after the log was created, e.g. from .env)."""
+        if level:
+            self.min_level = LEVELS.get(str(level).lower(), self.min_level)
+        if json_path and self._json_file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+            with self._lock:
+                self._json_file = open(json_path, 'w' if self._truncate else 'a', encoding='utf-8')
+            self.json_path = json_path
+
+    def set_context(self, **fields):
+        """Fields added to every following record (None removes a field)."""
+        for key, value in fields.items():
+            if value is None:
+                self._context.pop(key, None)
+            else:
+                self._context[key] = value
+
+    def __call__(self, message, level=None, **fields):
+        self.write_records([make_record(message, level, **fields)])
+
+    def debug(self, message, **fields):
+        self(message, 'debug', **fields)
+
+    def info(self, message, **fields):
+        self(message, 'info', **fields)
+
+    def warning(self, message, **fields):
+        self(message, 'warning', **fields)
+
+    def error(self, message, **fields):
+        self(message, 'error', **fields)
+
+    def write_records(self, records, **fields):
+        """Queue records (e.g. collected by a RecordCollector in a worker
+        process); fields and the current context fill in missing keys.
+        Raises ValueError once the log is closed."""
+        queued = []
+        for record in records:
+            if LEVELS.get(record['level'], LEVELS['info']) < self.min_level:
+                continue
+            for key, value in self._context.items():
+                record.setdefault(key, value)
+            for key, value in fields.items():
+                record.setdefault(key, value)
+            queued.append(record)
+        with self._queue_lock:
+            if self._closed:
+                raise ValueError(f"Run log '{self.path}' is closed")
+            for record in queued:
+                self._queue.put(record)
+
+    def _writer(self):
+        stop = False
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=FLUSH_INTERVAL)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # everything queued before close() is written, even after its None
+            stop = None in batch
+            self._write_batch([record for record in batch if record is not None])
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+        with self._lock:
+            text = []
+            for record in batch:
+                timestamp = datetime.fromtimestamp(record['time']).strftime('[%Y-%m-%d %H:%M:%S]')
+                text.append(f"{timestamp} {record['message']}\n")
+            self._file.write(''.join(text))
+            self._file.flush()
+            if self._json_file is not None:
+                lines = []
+                for record in batch:
+                    record = dict(record, elapsed=round(record['time'] - self.started, 3))
+                    lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+                self._json_file.write(''.join(lines))
+                self._json_file.flush()
+
+    def close(self):
+        """Write everything queued so far and close the files."""
+        with self._queue_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        with self._lock:
+            self._file.close()
+            if self._json_file is not None:
+                self._json_file.close()
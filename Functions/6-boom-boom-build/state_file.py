@@ -0,0 +1,36 @@
+"""Versioned JSON state files of the Cache directory (bundle catalog, string
+index, asset locator cache, build and export manifests), written atomically.
+"""
+
+import os
+import json
+
+
+def load_state(path, file_format, version, log_fn=None, name='state file',
+               outdated='ignoring it'):
+    """Payload of a state file, None when it is missing, unreadable or of
+    another format/version (logged as "<name> '<path>' is outdated,
+    <outdated>")."""
+    log = log_fn if log_fn else lambda msg: None
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except Exception as e:
+        log(f"Warning: failed to read {name} '{path}': {str(e)}")
+        return None
+    if (not isinstance(payload, dict) or payload.get('format') != file_format
+            or payload.get('version') != version):
+        log(f"{name[0].upper()}{name[1:]} '{path}' is outdated, {outdated}")
+        return None
+    return payload
+
+
+def save_state(path, file_format, version, **fields):
+    """Write a state file (via a temp file next to it)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': file_format, 'version': version, **fields}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -0,0 +1,71 @@
+"""Index of where every TMP string lives in the scene bundles.
+
+Written by the Exporter (EXPORT_STRINGS) and read by the Boom Boom Build
+patcher (patcher.py), which then only reads the TMP objects it patches.
+"""
+
+from state_file import load_state, save_state
+
+STRING_INDEX_FORMAT = 'string-index'
+# bump whenever the entry layout changes
+STRING_INDEX_VERSION = 1
+
+
+def strings_key(text):
+    """strings.json key of a TMP m_text (tabs and newlines escaped)."""
+    return text.replace('\t', '\\t').replace('\n', '\\n')
+
+
+class StringIndex:
+    """
+    TMP string occurrences of the scene bundles, keyed by bundle name and
+    guarded by bundle content hashes.
+    """
+
+    def __init__(self, path, log_fn=None, load=True):
+        """
+        :param path:    JSON file the index is stored in.
+        :param log_fn:  Optional callable(message: str) for logging.
+        :param load:    If False, start empty (the Exporter rebuilds the
+                        index as a whole on every strings export).
+        """
+        self.path = path
+        self.log = log_fn if log_fn else lambda msg: None
+        self.bundles = {}
+        if load:
+            self._load()
+
+    def _load(self):
+        payload = load_state(self.path, STRING_INDEX_FORMAT, STRING_INDEX_VERSION, self.log,
+                             'string index')
+        if payload is not None:
+            self.bundles = payload.get('bundles') or {}
+
+    def save(self):
+        save_state(self.path, STRING_INDEX_FORMAT, STRING_INDEX_VERSION, bundles=self.bundles)
+
+    def set_bundle(self, bundle_name, bundle_hash, occurrences):
+        """Store the occurrences of one bundle (nothing is stored without a
+        hash - such an entry could never be validated)."""
+        if bundle_hash is None:
+            self.bundles.pop(bundle_name, None)
+            return
+        self.bundles[bundle_name] = {'hash': bundle_hash, 'occurrences': occurrences}
+
+    def occurrences(self, bundle_name, bundle_hash):
+        """Occurrences of a bundle, None when it isn't indexed or the bundle
+        changed since."""
+        entry = self.bundles.get(bundle_name)
+        if entry is None or bundle_hash is None or entry['hash'] != bundle_hash:
+            return None
+        return entry['occurrences']
+
+    def objects_for(self, bundle_name, bundle_hash, keys):
+        """{(serialized file name, path_id)} of the TMP objects in a bundle
+        whose strings.json key is in keys, None when the bundle has no valid
+        entry (it then has to be scanned as a whole)."""
+        occurrences = self.occurrences(bundle_name, bundle_hash)
+        if occurrences is None:
+            return None
+        return {(file_name, path_id)
+                for key, file_name, path_id, _ in occurrences if key in keys}
@@ -0,0 +1,94 @@
+"""Persistent cache of texture overrides encoded into the game's formats.
+
+Entries (CACHE_DIR/<key>.bin + .json) are keyed by the PNG hash, target
+format, platform, dimensions, mip count and UnityPy version.
+"""
+
+import os
+import json
+import hashlib
+
+import UnityPy
+from UnityPy.enums import TextureFormat
+
+TEXTURE_CACHE_FORMAT = 'encoded-texture'
+# bump whenever the entry layout changes
+TEXTURE_CACHE_VERSION = 1
+
+
+def _replace_file(path, data, mode):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class EncodedTextureCache:
+    """
+    Encoded texture data by override hash and target format. Unreadable
+    entries are misses.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def key(self, png_hash, texture, size, mip_count):
+        """Cache key of an override PNG (content hash, size) encoded for a
+        Texture2D with mip_count mip levels."""
+        platform = texture.object_reader.platform if texture.object_reader is not None else 0
+        payload = json.dumps([TEXTURE_CACHE_VERSION, UnityPy.__version__, png_hash,
+                              int(texture.m_TextureFormat), int(platform),
+                              list(texture.m_PlatformBlob or []), list(size), mip_count])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key + ext)
+
+    def lookup(self, key):
+        """(entry, encoded data) of a cached texture, None on a miss."""
+        try:
+            with open(self._path(key, '.json'), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if (entry.get('format') != TEXTURE_CACHE_FORMAT
+                    or entry.get('version') != TEXTURE_CACHE_VERSION):
+                raise ValueError('outdated entry')
+            with open(self._path(key, '.bin'), 'rb') as f:
+                data = f.read()
+            if len(data) != entry['size']:
+                raise ValueError('truncated data')
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry, data
+
+    def store(self, key, texture, mip_count):
+        """Cache the image data a texture was just encoded into."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = bytes(texture.image_data)
+        _replace_file(self._path(key, '.bin'), data, 'wb')
+        _replace_file(self._path(key, '.json'), json.dumps({
+            'format': TEXTURE_CACHE_FORMAT,
+            'version': TEXTURE_CACHE_VERSION,
+            'texture_format': int(texture.m_TextureFormat),
+            'width': texture.m_Width,
+            'height': texture.m_Height,
+            'mip_count': mip_count,
+            'size': len(data),
+        }), 'w')
+
+    @staticmethod
+    def apply(texture, entry, data):
+        """Inject cached image data into a texture - what Texture2D.set_image
+        does after encoding."""
+        texture.m_Width = entry['width']
+        texture.m_Height = entry['height']
+        if texture.m_MipMap is not None:
+            texture.m_MipMap = entry['mip_count'] > 1
+        if texture.m_MipCount is not None:
+            texture.m_MipCount = entry['mip_count']
+        texture.image_data = data
+        texture.m_CompleteImageSize = len(data)
+        texture.m_TextureFormat = TextureFormat(entry['texture_format'])
+        if texture.m_StreamData is not None:
+            texture.m_StreamData.path = ""
+            texture.m_StreamData.offset = 0
+            texture.m_StreamData.size = 0
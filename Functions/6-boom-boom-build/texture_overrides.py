@@ -0,0 +1,83 @@
+"""Index of the texture overrides (OVERRIDES_DIR/*.png) of the listed textures.
+
+Maps each override PNG to the assets it replaces (by container file name, or
+SpriteAtlas name) and to the bundles holding them.
+"""
+
+import os
+
+from catalog import file_hash
+
+OVERRIDE_SUFFIX = '.png'
+ATLAS_SUFFIX = '.spriteatlas'
+
+
+def override_name(asset_path):
+    """File name of the override PNG for a listed texture or sprite atlas."""
+    name = os.path.basename(asset_path)
+    if name.endswith(ATLAS_SUFFIX):
+        return name.replace(ATLAS_SUFFIX, '') + OVERRIDE_SUFFIX
+    if not name.endswith(OVERRIDE_SUFFIX):
+        name += OVERRIDE_SUFFIX
+    return name
+
+
+class TextureOverrideIndex:
+    """
+    Override PNGs by listed asset path, and the assets routed to each bundle.
+    """
+
+    def __init__(self, overrides_dir):
+        self.overrides_dir = overrides_dir
+        self.overrides = {}  # listed asset path -> override PNG
+        self.routes = {}     # bundle name -> {asset path: override PNG}
+        self._hashes = {}    # override PNG -> content hash
+
+    def scan(self, asset_paths, log_fn=None):
+        """List OVERRIDES_DIR once and match its PNGs to asset_paths."""
+        log = log_fn if log_fn else lambda msg: None
+        self.overrides = {}
+        try:
+            # normcase: matched the way os.path.exists did (case-insensitive
+            # on Windows)
+            pngs = {os.path.normcase(entry.name): entry.path
+                    for entry in os.scandir(self.overrides_dir)
+                    if entry.is_file() and entry.name.lower().endswith(OVERRIDE_SUFFIX)}
+        except OSError as e:
+            log(f"Warning: failed to scan OVERRIDES_DIR '{self.overrides_dir}': {str(e)}")
+            return
+        for asset_path in asset_paths:
+            path = pngs.get(os.path.normcase(override_name(asset_path)))
+            if path is not None:
+                self.overrides[asset_path] = path
+        log(f"Texture override index: {len(set(self.overrides.values()))} override(s) "
+            f"for {len(self.overrides)} listed texture(s)")
+
+    def route(self, candidates, addressables=None, catalog=None):
+        """Assign the overridden assets to the candidates (bundle file names)
+        holding them, see addressables.bundles_holding. Returns the bundles
+        with at least one override, in the order of candidates."""
+        self.routes = {}
+        candidates = list(candidates)
+        # bundles the catalog failed to scan could hold anything
+        unknown = {name for name in candidates
+                   if catalog is not None and catalog.info(name) is None}
+        for asset_path, path in self.overrides.items():
+            found = addressables.bundles_for(asset_path) if addressables else None
+            if found is None and catalog is not None:
+                found = catalog.bundles_with_container(asset_path)
+            for bundle_name in candidates:
+                if found is not None and bundle_name not in found and bundle_name not in unknown:
+                    continue
+                self.routes.setdefault(bundle_name, {})[asset_path] = path
+        return [name for name in candidates if name in self.routes]
+
+    def bundle_overrides(self, bundle_name):
+        """{asset path: override PNG} of the overrides routed to a bundle."""
+        return self.routes.get(bundle_name, {})
+
+    def content_hash(self, path):
+        """Content hash of an override PNG, hashed once per run."""
+        if path not in self._hashes:
+            self._hashes[path] = file_hash(path)
+        return self._hashes[path]
@@ -50,6 +50,10 @@ import hashlib
 
 TMP_OVERRIDE_FORMAT = 'tmp-override'
 
+# top-level fields that identify a world-space TextMeshPro (see is_tmp_tree;
+# catalog.is_tmp_type checks them on the serialized type)
+TMP_FIELDS = ('m_text', 'm_fontAsset', '_SortingLayer')
+
 
 def is_tmp_tree(tree):
     """Detect a world-space TextMeshPro typetree by structure (the script
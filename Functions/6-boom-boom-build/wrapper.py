@@ -214,6 +214,7 @@ def _run(game_dir):
             textures_list_path=textures_list_path,
             on_progress=on_progress,
             clean_output=False,
+            mmap_input=True,
         )
         summary = patcher.run()
     except FileNotFoundError as e:
@@ -244,6 +245,12 @@ def _run(game_dir):
         f"Bundles patched:             {summary['bundles']}\n"
         f"Imported fonts:              {summary['fonts']}"
     )
+    if summary['failed']:
+        # these game files were left unpatched
+        print(f"\nError: failed to patch {len(summary['failed'])} bundle(s):")
+        for bundle_name in summary['failed']:
+            print(f"  {bundle_name}")
+        return 1
     return 0
 
 
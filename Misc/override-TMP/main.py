@@ -55,6 +55,9 @@ import UnityPy
 # shared TMP override logic lives in the bbb function
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..',
                                 'Functions', '6-boom-boom-build'))
+from catalog import BundleCatalog, is_tmp_type
+from asset_locator import read_unity_version
+from string_index import strings_key
 from tmp_override import (
     TMP_OVERRIDE_FORMAT,
     HierarchyResolver,
@@ -129,8 +132,12 @@ if os.getenv('UNITYPY_USE_PYTHON_PARSER') == 'true':
 
 def detect_unity_version(game_data_dir):
     """Detect the Unity version by reading resources.assets from the game data directory."""
+    resources_path = os.path.join(game_data_dir, 'resources.assets')
+    unity_version = read_unity_version(resources_path)
+    if unity_version:
+        return unity_version
     try:
-        env = UnityPy.load(os.path.join(game_data_dir, 'resources.assets'))
+        env = UnityPy.load(resources_path)
         for sf in env.files.values():
             if hasattr(sf, 'unity_version') and sf.unity_version:
                 return sf.unity_version
@@ -157,6 +164,22 @@ def sanitize_filename(s, max_len=64):
 scene_bundles = sorted(f for f in os.listdir(bundle_dir)
                        if f.endswith('.bundle') and '_scenes_' in f)
 
+bar_format = "{desc:<21}{percentage:3.0f}%|{bar}{r_bar}"
+
+# only scan the scene bundles that hold a TMP object with the target string
+# (the catalog is shared with the exporter and bbb and only rescans changed
+# bundles)
+catalog = BundleCatalog(bundle_dir, os.path.join(os.path.dirname(__file__), '..', '..',
+                                                 'Cache', 'bundle-catalog.json'))
+with tqdm(desc='Cataloging bundles:', bar_format=bar_format, ascii=(os.name == 'nt')) as bar:
+    def on_catalog_progress(current, total):
+        bar.total = total
+        bar.n = current
+        bar.refresh()
+    catalog.refresh(on_progress=on_catalog_progress)
+scene_bundles = catalog.bundles_with_tmp_texts(catalog.tmp_bundles(scene_bundles),
+                                               {strings_key(target_string)})
+
 # fingerprint -> {'tree', 'chain', 'transform', 'parents', 'occurrences'}
 # occurrences/parents are only used for the console summary, they are NOT
 # exported: bundle names and object ids can change between game patches, so
@@ -166,7 +189,6 @@ found = {}
 objects_num = 0
 unanchored_num = 0
 
-bar_format = "{desc:<21}{percentage:3.0f}%|{bar}{r_bar}"
 for bundle_name in tqdm(scene_bundles, desc='Scanning TMP objects:',
                         bar_format=bar_format, ascii=(os.name == 'nt')):
     file_path = os.path.join(bundle_dir, bundle_name)
@@ -179,7 +201,7 @@ for bundle_name in tqdm(scene_bundles, desc='Scanning TMP objects:',
     for obj in env.objects:
         if obj.type.name != 'MonoBehaviour':
             continue
-        if not obj.serialized_type.nodes:
+        if not is_tmp_type(obj):
             continue
         try:
             tree = obj.read_typetree()
@@ -0,0 +1,74 @@
+"""Throwaway smoke test for the streaming bundle writer.
+
+Verifies that bundle_writer.save_file() writes byte for byte what UnityPy's
+BundleFile.save() returns, for the none/lz4/original packers - run it after
+every UnityPy upgrade. Bundles given on the command line (e.g. from the
+game's StreamingAssets) are checked too, otherwise only generated ones.
+
+Run from the repo root:
+    Functions/6-boom-boom-build/.venv/bin/python Misc/smoke-test-bundle-writer.py [bundle ...]
+"""
+import io
+import os
+import struct
+import sys
+
+sys.path.insert(0, 'Functions/6-boom-boom-build')
+import UnityPy  # noqa: E402
+from bundle_writer import save_file  # noqa: E402
+
+PACKERS = ('none', 'lz4', 'original')
+
+
+def make_bundle(files):
+    """Minimal uncompressed UnityFS bundle (format 8) of raw files."""
+    data = b''.join(files.values())
+    info = b'\0' * 16 + struct.pack('>i', 1) + struct.pack('>IIH', len(data), len(data), 0x40)
+    info += struct.pack('>i', len(files))
+    offset = 0
+    for name, content in files.items():
+        info += struct.pack('>qqI', offset, len(content), 4) + name.encode() + b'\0'
+        offset += len(content)
+    head = b'UnityFS\0' + struct.pack('>I', 8) + b'5.x.x\0' + b'6000.0.1f1\0'
+    size_pos = len(head)
+    head += b'\0' * 8 + struct.pack('>III', len(info), len(info), 0x40)
+    head += b'\0' * ((16 - len(head) % 16) % 16)
+    out = head + info + data
+    return out[:size_pos] + struct.pack('>q', len(out)) + out[size_pos + 8:]
+
+
+def streamed(data, packer, **state):
+    env = UnityPy.load(data)
+    for key, value in state.items():
+        setattr(env.file, key, value)
+    fh = io.BytesIO()
+    save_file(env.file, fh, packer)
+    return fh.getvalue()
+
+
+def check(name, data):
+    for packer in PACKERS:
+        expected = UnityPy.load(data).file.save(packer=packer)
+        assert streamed(data, packer) == expected, f"{name}: {packer} output differs"
+    print(f"{name}: OK ({', '.join(PACKERS)})")
+
+
+# a compressible and an incompressible file, both spanning several LZ4 chunks
+generated = make_bundle({
+    'CAB-smoke': b'TextMeshPro ' * 60000,
+    'CAB-smoke.resS': os.urandom(300000),
+})
+check('generated (uncompressed)', generated)
+check('generated (lz4)', UnityPy.load(generated).file.save(packer='lz4'))
+
+# private BundleFile state it doesn't recognize makes it fall back to UnityPy
+bundle = UnityPy.load(generated).file
+bundle._uses_block_alignment = None
+expected = bundle.save(packer='original')
+assert streamed(generated, 'original', _uses_block_alignment=None) == expected
+print("fallback to BundleFile.save(): OK")
+
+for path in sys.argv[1:]:
+    with open(path, 'rb') as f:
+        check(os.path.basename(path), f.read())
+print("ALL SMOKE TESTS PASSED")
@@ -14,6 +14,10 @@ from dotenv import load_dotenv
 from tqdm import tqdm
 import UnityPy
 
+# the bundle catalog is shared with the bbb function
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Functions', '6-boom-boom-build'))
+from catalog import BundleCatalog  # noqa: E402
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'all-textures')
@@ -35,8 +39,16 @@ if os.path.isdir(OUT_DIR):
     shutil.rmtree(OUT_DIR)
 os.makedirs(OUT_DIR, exist_ok=True)
 
-bundles = [f for f in os.listdir(BUNDLE_DIR) if f.endswith('.bundle')]
-bundles.sort()
+# open only the bundles that hold Texture2D objects
+catalog = BundleCatalog(BUNDLE_DIR, os.path.join(os.path.dirname(__file__), '..', 'Cache', 'bundle-catalog.json'))
+with tqdm(desc='Cataloging bundles') as bar:
+    def on_catalog_progress(current, total):
+        bar.total = total
+        bar.n = current
+        bar.refresh()
+    # every bundle can hold textures, not only the candidates of the stages
+    catalog.refresh(on_progress=on_catalog_progress, name_filter=None)
+bundles = catalog.bundles_with_type(catalog.names(), 'Texture2D')
 
 textures_num = 0
 seen_paths = set()  # dedupe by output path (same texture can be in multiple bundles)
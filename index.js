@@ -83,6 +83,46 @@ const variables = {
         check: 'equalsTrueOrFalse',
         message: "does not equal to 'true' or 'false'"
     },
+    EXPORT_PROFILE: {
+        required_by: [],
+        check: 'checkExportProfile',
+        message: "is not 'release' or 'fast'"
+    },
+    INCREMENTAL: {
+        required_by: [],
+        check: 'equalsTrueOrFalse',
+        message: "does not equal to 'true' or 'false'"
+    },
+    WORKERS: {
+        required_by: [],
+        check: 'nonNegativeInteger',
+        message: 'is not a non-negative integer'
+    },
+    RECYCLE_WORKERS: {
+        required_by: [],
+        check: 'nonNegativeInteger',
+        message: 'is not a non-negative integer'
+    },
+    WORKER_MEMORY_LIMIT: {
+        required_by: [],
+        check: 'nonNegativeInteger',
+        message: 'is not a non-negative integer'
+    },
+    LOG_LEVEL: {
+        required_by: [],
+        check: 'checkLogLevel',
+        message: "is not 'debug', 'info', 'warning' or 'error'"
+    },
+    COMPRESSION: {
+        required_by: [],
+        check: 'checkCompression',
+        message: "is not 'original', 'lz4' or 'none'"
+    },
+    LOG_JSON: {
+        required_by: [],
+        check: 'equalsTrueOrFalse',
+        message: "does not equal to 'true' or 'false'"
+    },
     RES_DIR: {
         required_by: ['function:1-exporter', 'function:6-boom-boom-build', 'tool:sort-dialogues'],
         check: 'validDirOrCreatable',
@@ -189,6 +229,22 @@ const checks = {
         return ['true', 'false'].includes(value.toLowerCase());
     },
 
+    checkExportProfile: (value) => {
+        return ['release', 'fast'].includes(value.toLowerCase());
+    },
+
+    checkCompression: (value) => {
+        return ['original', 'lz4', 'none'].includes(value.toLowerCase());
+    },
+
+    checkLogLevel: (value) => {
+        return ['debug', 'info', 'warning', 'error'].includes(value.toLowerCase());
+    },
+
+    nonNegativeInteger: (value) => {
+        return /^\d+$/.test(value.trim());
+    },
+
     checkStorageValue: (value) => {
         if (value === 'GOOGLE') {
             return true;
@@ -300,8 +356,8 @@ async function checkEnvironment(requiredFor = null) {
 async function cleanup(all = false) {
     console.log(chalk.blue('Starting cleanup...'));
 
-    // Remove RES_DIR, TEXTURES_DIR, OUT_DIR and Logs
-    for (const dir of [process.env.RES_DIR, process.env.TEXTURES_DIR, process.env.OUT_DIR, path.join(__dirname, 'Logs')]) {
+    // Remove RES_DIR, TEXTURES_DIR, OUT_DIR, Logs and Cache
+    for (const dir of [process.env.RES_DIR, process.env.TEXTURES_DIR, process.env.OUT_DIR, path.join(__dirname, 'Logs'), path.join(__dirname, 'Cache')]) {
         if (dir && fs.existsSync(dir)) {
             console.log(`Removing directory: ${dir}`);
             fs.rmSync(dir, { recursive: true, force: true });